@@ -227,6 +227,124 @@ function normalizeStateKey(value: string): string {
   return aliases[raw] || raw;
 }
 
+// Region-id sidecars written by mapEditingTool/export_region_sidecars.py.
+// <map>.regions.png stores each pixel's region id (id = R + 256 * G) and
+// <map>.regions.json gives every id its "r,g,b" color and bbox, so a highlight
+// only repaints the selected regions' bbox instead of testing every pixel.
+// sourceSha256 is the SHA-256 of the map PNG the sidecar was exported from.
+interface RegionIndex {
+  width: number;
+  height: number;
+  sourceSha256: string;
+  regions: { id: number; color: string; bbox: [number, number, number, number] }[];
+}
+
+interface RegionSidecar {
+  index: RegionIndex;
+  ids: Uint16Array;
+}
+
+const HIGHLIGHT_WHITE = 1;
+const HIGHLIGHT_BRIGHTEN = 2;
+
+async function loadRegionSidecar(mapName: string, width: number, height: number): Promise<RegionSidecar | null> {
+  try {
+    const response = await fetch(`/maps/${mapName}.regions.json`);
+    if (!response.ok) return null;
+    const index: RegionIndex = await response.json();
+    // A sidecar from another version of the map is worse than none
+    if (index.width !== width || index.height !== height) return null;
+    if (!crypto.subtle || !index.sourceSha256) return null;
+    const source = await (await fetch(`/maps/${mapName}.png`)).arrayBuffer();
+    const digest = new Uint8Array(await crypto.subtle.digest('SHA-256', source));
+    const hex = Array.from(digest, byte => byte.toString(16).padStart(2, '0')).join('');
+    if (hex !== index.sourceSha256) {
+      console.warn(`Region sidecar for ${mapName} is stale; re-run export_region_sidecars.py`);
+      return null;
+    }
+
+    const img = new window.Image();
+    img.src = `/maps/${mapName}.regions.png`;
+    await img.decode();
+    const canvas = document.createElement('canvas');
+    canvas.width = width;
+    canvas.height = height;
+    const ctx = canvas.getContext('2d', { willReadFrequently: true });
+    if (!ctx) return null;
+    ctx.drawImage(img, 0, 0);
+    const rgba = ctx.getImageData(0, 0, width, height).data;
+
+    const ids = new Uint16Array(width * height);
+    const maxId = index.regions.length;
+    for (let p = 0, i = 0; p < ids.length; p++, i += 4) {
+      const id = rgba[i] + (rgba[i + 1] << 8);
+      if (id > maxId) return null;
+      ids[p] = id;
+    }
+    return { index, ids };
+  } catch (error) {
+    console.error(`Failed to load region sidecar for ${mapName}:`, error);
+    return null;
+  }
+}
+
+// Dim the whole map, then repaint only the bbox of the regions whose color
+// has a mode in `modeByColor` (HIGHLIGHT_WHITE or HIGHLIGHT_BRIGHTEN).
+function paintRegionHighlight(
+  ctx: CanvasRenderingContext2D,
+  sidecar: RegionSidecar,
+  original: ImageData,
+  modeByColor: Map<string, number>,
+) {
+  const { width } = sidecar.index;
+  const modes = new Uint8Array(sidecar.index.regions.length + 1);
+  let x0 = Infinity, y0 = Infinity, x1 = -Infinity, y1 = -Infinity;
+  for (const region of sidecar.index.regions) {
+    const mode = modeByColor.get(region.color);
+    if (!mode) continue;
+    modes[region.id] = mode;
+    x0 = Math.min(x0, region.bbox[0]);
+    y0 = Math.min(y0, region.bbox[1]);
+    x1 = Math.max(x1, region.bbox[2]);
+    y1 = Math.max(y1, region.bbox[3]);
+  }
+
+  // Everything outside the bbox is just 40% brightness
+  ctx.putImageData(original, 0, 0);
+  ctx.fillStyle = 'rgba(0, 0, 0, 0.6)';
+  ctx.fillRect(0, 0, original.width, original.height);
+  if (x0 === Infinity) return;
+
+  const w = x1 - x0;
+  const h = y1 - y0;
+  const patch = ctx.createImageData(w, h);
+  const src = original.data;
+  const dst = patch.data;
+  for (let y = 0; y < h; y++) {
+    let p = (y0 + y) * width + x0;
+    let o = y * w * 4;
+    for (let x = 0; x < w; x++, p++, o += 4) {
+      const i = p * 4;
+      const mode = modes[sidecar.ids[p]];
+      if (mode === HIGHLIGHT_WHITE) {
+        dst[o] = 255;
+        dst[o + 1] = 255;
+        dst[o + 2] = 255;
+      } else if (mode === HIGHLIGHT_BRIGHTEN) {
+        dst[o] = Math.min(255, Math.floor(src[i] * 1.5));
+        dst[o + 1] = Math.min(255, Math.floor(src[i + 1] * 1.5));
+        dst[o + 2] = Math.min(255, Math.floor(src[i + 2] * 1.5));
+      } else {
+        dst[o] = Math.floor(src[i] * 0.4);
+        dst[o + 1] = Math.floor(src[i + 1] * 0.4);
+        dst[o + 2] = Math.floor(src[i + 2] * 0.4);
+      }
+      dst[o + 3] = 255;
+    }
+  }
+  ctx.putImageData(patch, x0, y0);
+}
+
 interface Coin {
   id: string;
   index: string;
@@ -404,6 +522,7 @@ export default function Home() {
   const [colorMappings, setColorMappings] = useState<{state: string, color: string}[]>([]);
   const [mapCanvas, setMapCanvas] = useState<HTMLCanvasElement | null>(null);
   const [originalImageData, setOriginalImageData] = useState<ImageData | null>(null);
+  const [regionSidecar, setRegionSidecar] = useState<RegionSidecar | null>(null);
   const [showMappingModal, setShowMappingModal] = useState(false);
   const [editingMapping, setEditingMapping] = useState<{state: string, color: string} | null>(null);
   const [mappingFormState, setMappingFormState] = useState('');
@@ -417,6 +536,7 @@ export default function Home() {
   const [presidenciesColorMappings, setPresidenciesColorMappings] = useState<{state: string, color: string}[]>([]);
   const [presidenciesMapCanvas, setPresidenciesMapCanvas] = useState<HTMLCanvasElement | null>(null);
   const [presidenciesOriginalImageData, setPresidenciesOriginalImageData] = useState<ImageData | null>(null);
+  const [presidenciesRegionSidecar, setPresidenciesRegionSidecar] = useState<RegionSidecar | null>(null);
   const [selectedPresidency, setSelectedPresidency] = useState<string | null>(null);
   const [textBoxValue, setTextBoxValue] = useState('');
   const [isTextExpanded, setIsTextExpanded] = useState(false);
@@ -932,6 +1052,16 @@ export default function Home() {
         return;
       }
 
+      // Fast path: look region ids up in the sidecar and repaint only their bbox
+      if (regionSidecar) {
+        const modeByColor = new Map(
+          targetColors.map((t): [string, number] => [`${t.r},${t.g},${t.b}`, HIGHLIGHT_WHITE])
+        );
+        paintRegionHighlight(ctx, regionSidecar, originalImageData, modeByColor);
+        setIsHighlighting(false);
+        return;
+      }
+
       // Get image data and highlight the matching colors
       const imageData = ctx.getImageData(0, 0, mapCanvas.width, mapCanvas.height);
       const data = imageData.data;
@@ -982,7 +1112,7 @@ export default function Home() {
 
       highlightStateOnMap(statesToHighlight.length > 0 ? statesToHighlight : null);
     }
-  }, [selectedState, selectedSubsection, colorMappings, mapCanvas, originalImageData, coins, activeTab]);
+  }, [selectedState, selectedSubsection, colorMappings, mapCanvas, originalImageData, regionSidecar, coins, activeTab]);
 
   const highlightPresidencyOnMap = (presidencyNames: string[] | null) => {
     if (!presidenciesMapCanvas || !presidenciesOriginalImageData) return;
@@ -1019,6 +1149,18 @@ export default function Home() {
         {r:0,g:190,b:180}, {r:0,g:140,b:130},                          // Arcot
       ];
 
+      if (presidenciesRegionSidecar) {
+        const modeByColor = new Map(
+          targetColors.map((t): [string, number] => {
+            const isAnnexed = annexedColors.some(c => c.r === t.r && c.g === t.g && c.b === t.b);
+            return [`${t.r},${t.g},${t.b}`, isAnnexed ? HIGHLIGHT_WHITE : HIGHLIGHT_BRIGHTEN];
+          })
+        );
+        paintRegionHighlight(ctx, presidenciesRegionSidecar, presidenciesOriginalImageData, modeByColor);
+        setIsHighlighting(false);
+        return;
+      }
+
       const imageData = ctx.getImageData(0, 0, presidenciesMapCanvas.width, presidenciesMapCanvas.height);
       const data = imageData.data;
 
@@ -1066,7 +1208,7 @@ export default function Home() {
         highlightPresidencyOnMap(null);
       }
     }
-  }, [selectedPresidency, presidenciesColorMappings, presidenciesMapCanvas, presidenciesOriginalImageData, activeTab, mapMode]);
+  }, [selectedPresidency, presidenciesColorMappings, presidenciesMapCanvas, presidenciesOriginalImageData, presidenciesRegionSidecar, activeTab, mapMode]);
 
   const fetchCoins = async () => {
     try {
@@ -3126,6 +3268,8 @@ export default function Home() {
                             if (imageData) {
                               setOriginalImageData(imageData);
                             }
+                            loadRegionSidecar('princely-states', canvas.width, canvas.height)
+                              .then(setRegionSidecar);
                           };
                           img.onerror = () => {
                             console.error('Failed to load Princely States map image');
@@ -3592,6 +3736,8 @@ export default function Home() {
                             if (imageData) {
                               setPresidenciesOriginalImageData(imageData);
                             }
+                            loadRegionSidecar('presidencies-map', canvas.width, canvas.height)
+                              .then(setPresidenciesRegionSidecar);
                           };
                           img.onerror = () => {
                             console.error('Failed to load Presidencies map image');
@@ -7,6 +7,8 @@ roughly in the area around modern Chennai and Vellore.
 from PIL import Image, ImageDraw
 import numpy as np
 
+from mapio import save_image
+
 # Load the map
 input_map = "/Users/sahanavasanth/Desktop/LavenderCoinApp/public/maps/princely-states.png"
 output_map = "/Users/sahanavasanth/Desktop/LavenderCoinApp/public/maps/princely-states-with-arcot.png"
@@ -59,7 +61,7 @@ print("Drawing Arcot region...")
 draw.polygon(arcot_polygon, fill=arcot_color, outline=arcot_color)
 
 # Save the modified map
-draw_img.save(output_map)
+save_image(draw_img, output_map, 'production')
 print(f"✓ Saved map with Arcot region to: {output_map}")
 print(f"✓ Arcot region color: RGB({arcot_color[0]}, {arcot_color[1]}, {arcot_color[2]})")
 print(f"\nTo use this map:")
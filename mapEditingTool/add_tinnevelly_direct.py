@@ -5,7 +5,6 @@ Below Sivagangai, east of Travancore, southernmost tip of India.
 """
 from PIL import Image
 import numpy as np
-from collections import deque
 
 # Arcot/Tinnevelly colors
 TINNEVELLY_COLOR = (0, 190, 180)
@@ -28,31 +27,6 @@ print(f"Princely map: {pW}x{pH}")
 
 pixels = np.array(princely_img)
 
-def flood_fill_color(pixels_arr, seed_x, seed_y, target_color, tolerance=10):
-    """Flood fill matching a specific color."""
-    h, w = pixels_arr.shape[:2]
-    visited = set()
-    region = set()
-    queue = deque([(seed_x, seed_y)])
-    tr, tg, tb = target_color
-
-    while queue:
-        x, y = queue.popleft()
-        if (x, y) in visited:
-            continue
-        if x < 0 or x >= w or y < 0 or y >= h:
-            continue
-        visited.add((x, y))
-
-        r, g, b = pixels_arr[y, x]
-        if abs(int(r) - tr) <= tolerance and abs(int(g) - tg) <= tolerance and abs(int(b) - tb) <= tolerance:
-            region.add((x, y))
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nx, ny = x + dx, y + dy
-                if (nx, ny) not in visited:
-                    queue.append((nx, ny))
-    return region
-
 # First, let's find what color is at the southernmost tip
 # Approximate coordinates for southernmost region (below Sivagangai, east of Travancore)
 # This should be around x=3000-3500, y=6200-6400 (very south)
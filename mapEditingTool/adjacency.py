@@ -0,0 +1,130 @@
+"""
+Region adjacency graph of a label raster: which regions share a border, and
+how long that border is.
+
+Edits such as "fill the peach adjacent to Ramnad" or "the pocket between
+South Arcot, Tanjore and the coast" used to pick a window and a seed by hand
+and rescan the pixels inside. Here every horizontally and vertically
+neighbouring pixel pair with different labels is collected in one
+vectorized pass. Each pair is packed into one int64 key (smaller label high)
+and counted with np.unique, which gives the length of every shared border in
+pixel edges. Questions about neighbours are then set operations on a few
+thousand edges.
+
+Works on any int label raster: regionindex.RegionIndex.labels() (one-color
+regions, the usual case), floodfill.label_regions() or a regionmap.RegionMap.
+Lines drawn between areas are regions of their own: the presidency meets the
+sea through its peach_border outline, so a query names that class rather
+than 'sea'.
+
+Usage:
+    from adjacency import adjacency_graph
+    from regionindex import load_index
+
+    index = load_index(presidencies_path)
+    graph = adjacency_graph(index.labels())
+    graph.neighbors(index.region_at(3400, 6000))        # [(id, border length)], longest first
+    pockets = graph.touching_all(index.select(palette, 'peach'),
+                                 [index.select(palette, 'ramnad*'), index.select(palette, 'peach_border')])
+
+    python adjacency.py ../public/maps/presidencies-map.png peach --touching 'ramnad*' peach_border
+"""
+import argparse
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from palette import map_palette
+from regionindex import load_index
+
+_LABEL_SHIFT = 32   # pair key: smaller label << 32 | larger label
+
+
+class RegionGraph(NamedTuple):
+    """Undirected edges between labels that share a border, sorted by (a, b)."""
+    pairs: np.ndarray       # (m, 2) int64 labels a < b
+    lengths: np.ndarray     # (m,) int64 shared border, in pixel edges
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def _incident(self, label):
+        """(edge indices, other label) of every edge of `label`."""
+        edges = np.flatnonzero((self.pairs[:, 0] == label) | (self.pairs[:, 1] == label))
+        ends = self.pairs[edges]
+        return edges, np.where(ends[:, 0] == label, ends[:, 1], ends[:, 0])
+
+    def neighbors(self, label):
+        """[(label, border length)] of every neighbour, longest border first."""
+        edges, others = self._incident(label)
+        order = np.argsort(-self.lengths[edges], kind='stable')
+        return [(int(others[i]), int(self.lengths[edges[i]])) for i in order]
+
+    def border(self, a, b):
+        """Length of the border between two labels, 0 when they do not touch."""
+        key = (min(a, b) << _LABEL_SHIFT) | max(a, b)
+        keys = (self.pairs[:, 0] << _LABEL_SHIFT) | self.pairs[:, 1]
+        i = np.searchsorted(keys, key)
+        return int(self.lengths[i]) if i < len(keys) and keys[i] == key else 0
+
+    def border_with(self, labels, others):
+        """Border length of each of `labels` with the set `others`, as an array aligned with `labels`."""
+        labels = np.asarray(labels)
+        a, b = self.pairs[:, 0], self.pairs[:, 1]
+        # Edges with one end in `others`, weighted onto the end in `labels`
+        lengths = np.zeros(len(labels), dtype=np.int64)
+        order = np.argsort(labels, kind='stable')
+        for ends, far in ((a, b), (b, a)):
+            hit = np.isin(far, others) & np.isin(ends, labels)
+            slot = order[np.searchsorted(labels, ends[hit], sorter=order)]
+            np.add.at(lengths, slot, self.lengths[hit])
+        return lengths
+
+    def touching_all(self, labels, groups):
+        """The `labels` that share a border with at least one label of every group."""
+        labels = np.asarray(labels)
+        keep = np.ones(len(labels), dtype=bool)
+        for group in groups:
+            keep &= self.border_with(labels, group) > 0
+        return labels[keep]
+
+
+def adjacency_graph(labels):
+    """RegionGraph of a 2-D int label raster, 4-connected (shared edges, not corners)."""
+    labels = np.asarray(labels).astype(np.int64, copy=False)
+    across = labels[:, :-1] != labels[:, 1:]
+    down = labels[:-1, :] != labels[1:, :]
+    a = np.concatenate([labels[:, :-1][across], labels[:-1, :][down]])
+    b = np.concatenate([labels[:, 1:][across], labels[1:, :][down]])
+    keys, lengths = np.unique((np.minimum(a, b) << _LABEL_SHIFT) | np.maximum(a, b), return_counts=True)
+    pairs = np.stack([keys >> _LABEL_SHIFT, keys & ((1 << _LABEL_SHIFT) - 1)], axis=1)
+    return RegionGraph(pairs, lengths.astype(np.int64))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="List the regions of one palette class that border every given class.")
+    parser.add_argument('image')
+    parser.add_argument('classes', nargs='+', help="palette classes of the regions to list ('peach', 'ramnad*')")
+    parser.add_argument('--touching', nargs='+', default=[], metavar='CLASS',
+                        help="classes each listed region must border; 'sea' is the background around (0, 0)")
+    parser.add_argument('--tolerance', type=int, default=9)
+    args = parser.parse_args()
+
+    started = time.time()
+    index = load_index(args.image)
+    graph = adjacency_graph(index.labels())
+    print(f"{len(index)} regions, {len(graph)} borders ({time.time() - started:.2f}s)")
+
+    palette = map_palette(args.tolerance)
+    groups = [[index.region_at(0, 0)] if name == 'sea' else index.select(palette, name)
+              for name in args.touching]
+    found = graph.touching_all(index.select(palette, *args.classes), groups)
+    print(f"{len(found)} {' '.join(args.classes)} region(s) bordering {' and '.join(args.touching) or 'anything'}:")
+    for region_id in sorted(found, key=lambda i: -index.areas[i]):
+        region = index.region(region_id)
+        borders = ', '.join(f"{name} {int(graph.border_with([region_id], group)[0])}"
+                            for name, group in zip(args.touching, groups))
+        print(f"  #{region_id:<7} {region.area:>9,} px  bbox {region.bbox}  seed {region.seed}"
+              + (f"  border: {borders}" if borders else ""))
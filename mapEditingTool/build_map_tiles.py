@@ -0,0 +1,22 @@
+"""
+Cut the maps in public/maps into XYZ tile pyramids under public/tiles (tiles.py).
+
+Each map is decoded once; only tiles whose pixels changed since the last run
+are re-encoded, so re-running after a small fix is quick.
+"""
+from mapio import cached_image
+from tiles import build_pyramid
+
+MAPS_DIR = '/Users/sahanavasanth/Desktop/LavenderCoinApp/public/maps'
+TILES_DIR = '/Users/sahanavasanth/Desktop/LavenderCoinApp/public/tiles'
+
+MAPS = ['princely-states', 'presidencies-map', 'european-trading-posts-1600-1750']
+
+for name in MAPS:
+    print(f"Tiling {name}.png...")
+    pixels = cached_image(f'{MAPS_DIR}/{name}.png')
+    stats = build_pyramid(pixels, f'{TILES_DIR}/{name}')
+    print(f"  Zoom 0-{stats.max_zoom}: {stats.changed} native tiles changed, "
+          f"{stats.written} tiles written, {stats.skipped} unchanged")
+
+print("Done!")
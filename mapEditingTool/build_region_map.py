@@ -0,0 +1,39 @@
+"""
+Encode the princely states map as a canonical region-id raster (regionmap.py),
+check that it renders back to the same RGB image, and report what it holds.
+
+Writes Backup/princely-states.regions.npz (uint16 ids + region table), which
+mapedit plans load with {"regions": ...} images and keep up to date as an
+output (plans/render-princely-states.json).
+"""
+from PIL import Image
+import numpy as np
+
+from regionmap import ALL_KINDS, FILL, OTHER, RegionMap, state_table
+
+MAP_PATH = '/Users/sahanavasanth/Desktop/LavenderCoinApp/public/maps/princely-states.png'
+REGIONS_PATH = '/Users/sahanavasanth/Desktop/LavenderCoinApp/Backup/princely-states.regions.npz'
+
+pixels = np.array(Image.open(MAP_PATH).convert('RGB'))
+region_map = RegionMap.from_rgb(pixels, state_table(pixels=pixels))
+
+mismatched = int(np.count_nonzero((region_map.render() != pixels).any(axis=-1)))
+if mismatched:
+    raise SystemExit(f"Region map does not round-trip: {mismatched} pixels differ")
+
+table = region_map.table
+counts = np.bincount(region_map.ids.ravel(), minlength=len(table))
+others = sum(1 for e in table.entries[1:] if e.kind == OTHER)
+print(f"{len(table) - 1} region ids ({others} 'other' colors), "
+      f"{region_map.ids.nbytes / 1e6:.1f} MB raster vs {pixels.nbytes / 1e6:.1f} MB RGB")
+
+print("\nState pixel counts:")
+reported = set()
+for region_id, entry in enumerate(table.entries):
+    if entry.kind == FILL and counts[region_id] and entry.name not in reported:
+        reported.add(entry.name)
+        total = int(counts[table.ids(entry.name, ALL_KINDS)].sum())
+        print(f"  {' / '.join(entry.states):30s} {total:10d}")
+
+region_map.save(REGIONS_PATH)
+print(f"\nSaved {REGIONS_PATH}")
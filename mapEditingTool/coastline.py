@@ -0,0 +1,106 @@
+"""
+Land/sea mask and per-row coastline of the outline map, built once and cached.
+
+calibrate_map.py and create_trading_posts_map.py each scanned the outline
+map row by row for the coast. Here the sea is the white background
+flood-filled from the (0, 0) corner, and everything it does not reach is
+land. rle.RunMask run-length encodes the land mask of every row at once.
+Runs separated by less than COAST_GAP pixels of sea (estuaries, creeks,
+backwaters) are joined, and the longest joined run in each row is the main
+landmass: its first pixel is the west coast and its last pixel the east
+coast. Islands, Sri Lanka and the far shores of the Bay of Bengal therefore
+never count as the coast of the peninsula.
+
+The result is saved as a .coast.npz next to the map: the land mask
+bit-packed by row, plus the west and east coast of every row. The file is
+keyed by the map's size and mtime and rebuilt when the map changes. A
+Coastline answers any row or pixel query with one array lookup.
+
+Usage:
+    from coastline import load_coastline
+
+    coast = load_coastline(outline_path)    # decodes the map only on a cache miss
+    west, east = coast.row(4800)            # None for rows without land
+    coast.is_land(3500, 5200)
+    land = coast.land_mask()                # (h, w) bool
+"""
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from floodfill import flood_fill
+from mapio import cached_image
+from rle import RunMask
+
+WHITE = 240         # a pixel is background when all its channels are at least this
+COAST_GAP = 64      # sea narrower than this inside a row (estuaries, backwaters) does not end the coast
+
+
+class Coastline(NamedTuple):
+    """Land mask and main-landmass coasts of a map."""
+    shape: tuple            # (h, w)
+    land_bits: np.ndarray   # (h, ceil(w / 8)) uint8, np.packbits of each row of the land mask
+    west: np.ndarray        # (h,) int32 x of each row's west coast, -1 where the row has no land
+    east: np.ndarray        # (h,) int32 x of each row's east coast (inclusive), -1 likewise
+
+    def row(self, y):
+        """(west, east) x of the main landmass in row y, or None."""
+        if not 0 <= y < self.shape[0] or self.west[y] < 0:
+            return None
+        return int(self.west[y]), int(self.east[y])
+
+    def is_land(self, x, y):
+        return bool(self.land_bits[y, x >> 3] & (0x80 >> (x & 7)))
+
+    @property
+    def rows(self):
+        """(first, last) row that has land, inclusive."""
+        ys = np.flatnonzero(self.west >= 0)
+        return int(ys[0]), int(ys[-1])
+
+    def land_mask(self):
+        return np.unpackbits(self.land_bits, axis=1, count=self.shape[1]).astype(bool)
+
+
+def find_coastline(pixels, white=WHITE, max_gap=COAST_GAP):
+    """Coastline of an (h, w, 3) map whose sea is the white background around (0, 0)."""
+    h, w = pixels.shape[:2]
+    sea = flood_fill(pixels, 0, 0, lambda row: (row[..., :3] >= white).all(axis=-1))
+    if not sea.mask.size:
+        raise ValueError("The map's (0, 0) corner is not background; cannot tell sea from land")
+    land = ~sea.full_mask((h, w))
+
+    # Runs split only by an estuary, creek or backwater are one stretch of coast
+    rows, starts, ends = RunMask.from_mask(land).joined(max_gap)
+
+    # Longest run of every row: sort runs by row, then by length descending
+    order = np.lexsort((starts - ends, rows))
+    rows, starts, ends = rows[order], starts[order], ends[order]
+    first = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]]) if len(rows) else rows
+    west = np.full(h, -1, dtype=np.int32)
+    east = np.full(h, -1, dtype=np.int32)
+    west[rows[first]] = starts[first]
+    east[rows[first]] = ends[first] - 1
+    return Coastline((h, w), np.packbits(land, axis=1), west, east)
+
+
+def coast_path(image_path):
+    return os.path.splitext(image_path)[0] + '.coast.npz'
+
+
+def load_coastline(image_path, white=WHITE, max_gap=COAST_GAP):
+    """find_coastline() of a map file, cached beside it until the map changes."""
+    path = coast_path(image_path)
+    st = os.stat(image_path)
+    stamp = np.array([st.st_size, st.st_mtime_ns, white, max_gap], dtype=np.int64)
+    if os.path.exists(path):
+        with np.load(path) as data:
+            if np.array_equal(data['stamp'], stamp):
+                return Coastline(tuple(data['shape']), data['land_bits'], data['west'], data['east'])
+    coast = find_coastline(cached_image(image_path), white, max_gap)
+    tmp_path = f'{path}.{os.getpid()}.tmp.npz'
+    np.savez_compressed(tmp_path, stamp=stamp, shape=np.array(coast.shape),
+                        land_bits=coast.land_bits, west=coast.west, east=coast.east)
+    os.replace(tmp_path, path)
+    return coast
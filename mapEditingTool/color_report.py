@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Color inventory of the app's maps, checked against their color mappings.
+
+The map tab highlights a state by testing pixels for exact equality with the
+colors its mapping lists (app/page.tsx, highlightStateOnMap). A color drawn on
+the map but missing from the mapping is never highlighted, and so is a
+near-copy of a mapped color left by an edit or a resample. This counts every
+color of each map (palette.color_counts) and joins the counts against
+the mapping snapshot in Backup/. It reports:
+
+- unmapped colors, with pixel counts (gray lines and labels included);
+- mapped colors that never appear on the map;
+- near-duplicates: unmapped colors within --tolerance of a mapped one, which
+  look like that state but will not light up with it;
+- conflicts: one mapped color listed for several states, or mapped colors of
+  different states within --tolerance of each other.
+
+Usage:
+    python color_report.py                              # every map in MAPS
+    python color_report.py princely-states --tolerance 4 --min-pixels 50
+    python color_report.py --strict                     # exit 1 on near-duplicates or conflicts
+"""
+import argparse
+import json
+import sys
+import time
+from collections import defaultdict
+from typing import NamedTuple
+
+import numpy as np
+
+from mapio import cached_image
+from palette import color_counts, unpack_rgb
+
+APP = '/Users/sahanavasanth/Desktop/LavenderCoinApp'
+
+# (map in public/maps, color mappings snapshot in Backup)
+MAPS = [
+    ('princely-states', 'princely-states-map-colors.json'),
+    ('presidencies-map', 'presidencies-map-colors.json'),
+    ('european-trading-posts-1600-1750', 'european-map-colors.json'),
+]
+
+TOLERANCE = 6       # per-channel difference up to which two colors look the same
+MIN_PIXELS = 100    # unmapped colors with fewer pixels are only summarized
+LISTED = 25         # unmapped colors and near-duplicates listed per map
+
+
+class ColorReport(NamedTuple):
+    name: str
+    pixels: int                 # total pixels
+    colors: int                 # distinct colors
+    unmapped: list              # [(color, count)], most pixels first
+    missing: list               # [(color, states)] mapped but absent
+    near: list                  # [(color, count, mapped color, states)]
+    conflicts: list             # [(color, states, other color, other states)]; other is None for a shared color
+
+
+def rgb_text(color):
+    return ','.join(str(int(c)) for c in unpack_rgb(color))
+
+
+def load_mappings(path):
+    """{packed color: [state, ...]} from a Backup/*-map-colors.json list."""
+    with open(path) as f:
+        entries = json.load(f)
+    mappings = defaultdict(list)
+    for entry in entries:
+        r, g, b = (int(c) for c in entry['color'].split(','))
+        states = mappings[(r << 16) | (g << 8) | b]
+        if entry['state'] not in states:
+            states.append(entry['state'])
+    return dict(mappings)
+
+
+def _close(a, b, tolerance):
+    """(len(a), len(b)) bool: packed colors within `tolerance` on every channel."""
+    diff = np.abs(unpack_rgb(a)[:, None, :].astype(np.int16) - unpack_rgb(b)[None, :, :])
+    return (diff <= tolerance).all(axis=-1)
+
+
+def color_report(name, pixels, mappings, tolerance=TOLERANCE):
+    colors, counts = color_counts(pixels)
+    mapped = np.array(sorted(mappings), dtype=np.uint32)
+    present = np.isin(mapped, colors)
+    is_mapped = np.isin(colors, mapped)
+
+    order = np.argsort(-counts[~is_mapped], kind='stable')
+    unmapped_colors, unmapped_counts = colors[~is_mapped][order], counts[~is_mapped][order]
+    missing = [(int(c), mappings[int(c)]) for c in mapped[~present]]
+
+    near = []
+    if len(mapped) and len(unmapped_colors):
+        close = _close(unmapped_colors, mapped, tolerance)
+        for i, j in zip(*np.nonzero(close)):
+            near.append((int(unmapped_colors[i]), int(unmapped_counts[i]), int(mapped[j]),
+                         mappings[int(mapped[j])]))
+
+    conflicts = [(int(c), states, None, None) for c, states in sorted(mappings.items()) if len(states) > 1]
+    close = np.triu(_close(mapped, mapped, tolerance), k=1)
+    for i, j in zip(*np.nonzero(close)):
+        a, b = int(mapped[i]), int(mapped[j])
+        if set(mappings[a]) != set(mappings[b]):
+            conflicts.append((a, mappings[a], b, mappings[b]))
+
+    return ColorReport(name, int(counts.sum()), len(colors),
+                       list(zip(unmapped_colors.tolist(), unmapped_counts.tolist())),
+                       missing, near, conflicts)
+
+
+def print_report(report, min_pixels=MIN_PIXELS):
+    print(f"\n=== {report.name}: {report.colors} colors over {report.pixels:,} pixels ===")
+
+    listed = [(c, n) for c, n in report.unmapped if n >= min_pixels]
+    rest = report.unmapped[len(listed):]
+    print(f"\nUnmapped colors: {len(report.unmapped)} "
+          f"({sum(n for _, n in report.unmapped):,} pixels)")
+    for color, count in listed[:LISTED]:
+        print(f"  {rgb_text(color):>13}: {count:>10,} px")
+    if len(listed) > LISTED:
+        print(f"  ... {len(listed) - LISTED} more with {min_pixels}+ pixels")
+    if rest:
+        print(f"  ... {len(rest)} with under {min_pixels} pixels ({sum(n for _, n in rest):,} pixels)")
+
+    print(f"\nMapped colors not on the map: {len(report.missing)}")
+    for color, states in report.missing:
+        print(f"  {rgb_text(color):>13}: {', '.join(states)}")
+
+    near = sorted(report.near, key=lambda n: -n[1])
+    print(f"\nNear-duplicates of mapped colors (not highlighted): {len(near)} "
+          f"({sum(n for _, n, _, _ in near):,} pixels)")
+    for color, count, mapped, states in near[:LISTED]:
+        print(f"  {rgb_text(color):>13}: {count:>10,} px, looks like {rgb_text(mapped)} ({', '.join(states)})")
+    if len(near) > LISTED:
+        print(f"  ... {len(near) - LISTED} more ({sum(n for _, n, _, _ in near[LISTED:]):,} pixels)")
+
+    print(f"\nMapping conflicts: {len(report.conflicts)}")
+    for color, states, other, other_states in report.conflicts:
+        if other is None:
+            print(f"  {rgb_text(color):>13}: mapped to {', '.join(states)}")
+        else:
+            print(f"  {rgb_text(color):>13} ({', '.join(states)}) is within tolerance of "
+                  f"{rgb_text(other)} ({', '.join(other_states)})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check map colors against the color mappings.")
+    parser.add_argument('maps', nargs='*', help=f"map names (default: {', '.join(n for n, _ in MAPS)})")
+    parser.add_argument('--tolerance', type=int, default=TOLERANCE,
+                        help="per-channel difference counted as a near-duplicate")
+    parser.add_argument('--min-pixels', type=int, default=MIN_PIXELS,
+                        help="list unmapped colors with at least this many pixels")
+    parser.add_argument('--strict', action='store_true',
+                        help="exit with status 1 if any map has near-duplicates or conflicts")
+    args = parser.parse_args()
+
+    known = dict(MAPS)
+    unknown = [name for name in args.maps if name not in known]
+    if unknown:
+        parser.error(f"unknown map(s): {', '.join(unknown)}")
+
+    failed = False
+    for name in args.maps or known:
+        started = time.time()
+        pixels = cached_image(f'{APP}/public/maps/{name}.png')
+        report = color_report(name, pixels, load_mappings(f'{APP}/Backup/{known[name]}'), args.tolerance)
+        print_report(report, args.min_pixels)
+        print(f"\n({time.time() - started:.1f}s)")
+        failed |= bool(report.near or report.conflicts)
+
+    sys.exit(1 if args.strict and failed else 0)
@@ -0,0 +1,159 @@
+"""
+Region boundaries for the map editing scripts.
+
+boundary_mask() finds edge pixels with array shifts. trace_contours() follows
+the cracks between region and background pixels and returns every closed
+outline in order, outer rings and inner rings (holes) alike, so a dotted border
+can be laid out along the outline by arc length instead of in raster order.
+
+Usage:
+    from contours import boundary_mask, dashed_pixels, region_contours
+
+    rings = region_contours(district)           # district is a floodfill.Region
+    for x, y in dashed_pixels(rings, dash=4, gap=3):
+        ...                                     # draw one dot of the border
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+# Step for each edge direction: west, south, east, north (y grows downwards)
+_STEPS = np.array([(-1, 0), (0, 1), (1, 0), (0, -1)])
+WEST, SOUTH, EAST, NORTH = range(4)
+
+
+class Contour(NamedTuple):
+    """
+    One closed outline.
+
+    `points` holds the n + 1 pixel-corner vertices of the ring (first == last),
+    one unit apart, so vertex i sits at arc length i. `pixels` holds, for each
+    of the n edges, the (x, y) of the region pixel the edge belongs to. Outer
+    rings run counter-clockwise on screen; holes run clockwise.
+    """
+    points: np.ndarray
+    pixels: np.ndarray
+    is_hole: bool
+
+    @property
+    def length(self):
+        return len(self.pixels)
+
+
+def boundary_mask(mask):
+    """Pixels of `mask` with at least one 4-neighbour outside it (or off the edge)."""
+    padded = np.pad(mask, 1)
+    inner = (padded[:-2, 1:-1] & padded[2:, 1:-1] &
+             padded[1:-1, :-2] & padded[1:-1, 2:])
+    return mask & ~inner
+
+
+def _edges(mask):
+    """Directed boundary edges with the region on their left: start vertex, direction, pixel."""
+    padded = np.pad(mask, 1)
+    core = padded[1:-1, 1:-1]
+    neighbours = {
+        WEST: padded[:-2, 1:-1],   # above: edge runs west along the top
+        SOUTH: padded[1:-1, :-2],  # left: edge runs south down the left side
+        EAST: padded[2:, 1:-1],    # below: edge runs east along the bottom
+        NORTH: padded[1:-1, 2:],   # right: edge runs north up the right side
+    }
+    # Start corner of each edge relative to the pixel's top-left corner
+    start_offset = {WEST: (1, 0), SOUTH: (0, 0), EAST: (0, 1), NORTH: (1, 1)}
+    xs, ys, dirs = [], [], []
+    for d, neighbour in neighbours.items():
+        py, px = np.nonzero(core & ~neighbour)
+        xs.append(px)
+        ys.append(py)
+        dirs.append(np.full(len(px), d, dtype=np.int8))
+    px = np.concatenate(xs)
+    py = np.concatenate(ys)
+    d = np.concatenate(dirs)
+    offsets = np.array([start_offset[k] for k in range(4)])
+    sx = px + offsets[d, 0]
+    sy = py + offsets[d, 1]
+    return sx, sy, d, px, py
+
+
+def trace_contours(mask, origin=(0, 0)):
+    """
+    Every closed outline of a boolean mask, in order.
+
+    Works on pixel cracks, so cost follows the perimeter: edges are built with
+    array shifts, linked to their successor with one sort, and each ring is
+    then walked once. Where two region pixels touch only at a corner the walk
+    turns into the current pixel, keeping 4-connected regions separate.
+    `origin` = (x, y) is added to every coordinate.
+    """
+    h, w = mask.shape
+    sx, sy, d, px, py = _edges(mask)
+    n = len(sx)
+    if n == 0:
+        return []
+
+    ex = sx + _STEPS[d, 0]
+    ey = sy + _STEPS[d, 1]
+    stride = w + 1
+    start_key = sy.astype(np.int64) * stride + sx
+    end_key = ey.astype(np.int64) * stride + ex
+    order = np.argsort(start_key, kind='stable')
+    sorted_keys = start_key[order]
+
+    # Successor of every edge: the edge leaving its end vertex. At a corner
+    # shared by two diagonal pixels there are two; take the left turn.
+    first = np.searchsorted(sorted_keys, end_key, side='left')
+    count = np.searchsorted(sorted_keys, end_key, side='right') - first
+    nxt = order[first]
+    ambiguous = np.flatnonzero(count == 2)
+    if len(ambiguous):
+        left_turn = (d[ambiguous] + 1) % 4
+        alt = order[first[ambiguous] + 1]
+        use_alt = d[alt] == left_turn
+        nxt[ambiguous[use_alt]] = alt[use_alt]
+
+    ox, oy = origin
+    contours = []
+    seen = np.zeros(n, dtype=bool)
+    nxt = nxt.tolist()
+    for start in range(n):
+        if seen[start]:
+            continue
+        ring = []
+        e = start
+        while not seen[e]:
+            seen[e] = True
+            ring.append(e)
+            e = nxt[e]
+        ring = np.array(ring)
+        points = np.empty((len(ring) + 1, 2), dtype=np.int64)
+        points[:-1, 0] = sx[ring] + ox
+        points[:-1, 1] = sy[ring] + oy
+        points[-1] = points[0]
+        pixels = np.stack([px[ring] + ox, py[ring] + oy], axis=1)
+        # Shoelace area: counter-clockwise on screen (y down) is negative
+        area = np.sum(points[:-1, 0] * points[1:, 1] - points[1:, 0] * points[:-1, 1])
+        contours.append(Contour(points, pixels, bool(area > 0)))
+    return contours
+
+
+def region_contours(region):
+    """trace_contours() for a floodfill.Region, in full-image coordinates."""
+    return trace_contours(region.mask, origin=region.bbox[:2])
+
+
+def dashed_pixels(contours, dash=4, gap=3):
+    """
+    Boundary pixels lying on the dashes of a dash/gap pattern.
+
+    The pattern is laid out along each ring by arc length, restarting at every
+    ring, so dots follow the outline. Returns an (m, 2) array of (x, y).
+    """
+    period = dash + gap
+    picked = []
+    for contour in contours:
+        on = np.arange(contour.length) % period < dash
+        picked.append(contour.pixels[on])
+    if not picked:
+        return np.zeros((0, 2), dtype=np.int64)
+    # A pixel is shared by the edges around one of its corners; draw it once
+    return np.unique(np.concatenate(picked), axis=0)
@@ -6,26 +6,21 @@ Expanded canvas: title on top, info panels below the map.
 
 from PIL import Image, ImageDraw, ImageFont
 import math
-import numpy as np
 from collections import defaultdict
 
+from coastline import load_coastline
+from georef import Georef
+from mapio import save_image
+
 # ============================================================
 # Load base map and analyze coastline
 # ============================================================
-base_map = Image.open("/Users/sahanavasanth/Desktop/mapEditingTool/princely-states-outline.png")
+outline_path = "/Users/sahanavasanth/Desktop/mapEditingTool/princely-states-outline.png"
+base_map = Image.open(outline_path)
 MAP_W, MAP_H = base_map.size  # 7051, 6581
-pixels = np.array(base_map)
 
-print("Analyzing coastline...")
-west_coast_px = {}
-east_coast_px = {}
-for y in range(MAP_H):
-    row = pixels[y]
-    is_map = (row[:, 0] < 240) | (row[:, 1] < 240) | (row[:, 2] < 240)
-    indices = np.where(is_map)[0]
-    if len(indices) > 0:
-        west_coast_px[y] = int(indices[0])
-        east_coast_px[y] = int(indices[-1])
+# West/east coast of every row, cached beside the outline (coastline.py)
+COAST = load_coastline(outline_path)
 
 # ============================================================
 # Canvas layout: title bar + map + info panel
@@ -49,23 +44,14 @@ draw = ImageDraw.Draw(overlay)
 # ============================================================
 # Coordinate mapping (adjusted for MAP_Y_OFFSET)
 # ============================================================
-LAT_MAX = 37.0
-Y_SCALE = 213.7
-Y_OFFSET_GEO = 209
-
-
-def lat_to_y(lat):
-    return int((LAT_MAX - lat) * Y_SCALE + Y_OFFSET_GEO) + MAP_Y_OFFSET
-
-
-def lon_to_x(lon, lat):
-    sx = 190.86 + 0.442 * lat - 0.02105 * lat * lat
-    ox = -11695.4 - 11.51 * lat + 0.976 * lat * lat
-    return int(sx * lon + ox)
+# princely-states-outline.png shares the princely states map's georeferencing
+# (fit_georefs.py, from the coastline-calibrated fit this script used to carry)
+PRINCELY_GEOREF = Georef.load("/Users/sahanavasanth/Desktop/LavenderCoinApp/public/maps/princely-states.georef.json")
 
 
 def geo_to_pixel(lat, lon):
-    return lon_to_x(lon, lat), lat_to_y(lat)
+    x, y = PRINCELY_GEOREF.geo_to_pixel(lon, lat)
+    return int(x), int(y) + MAP_Y_OFFSET
 
 
 def snap_to_coast(x, y, coast_side, offset=10):
@@ -73,11 +59,13 @@ def snap_to_coast(x, y, coast_side, offset=10):
         return x, y
     # y on canvas -> y on original map
     map_y = y - MAP_Y_OFFSET
-    map_y = max(min(map_y, max(west_coast_px.keys())), min(west_coast_px.keys()))
-    if coast_side == "east" and map_y in east_coast_px:
-        return east_coast_px[map_y] - offset, map_y + MAP_Y_OFFSET
-    elif coast_side == "west" and map_y in west_coast_px:
-        return west_coast_px[map_y] + offset, map_y + MAP_Y_OFFSET
+    first, last = COAST.rows
+    map_y = max(min(map_y, last), first)
+    coast = COAST.row(map_y)
+    if coast_side == "east" and coast:
+        return coast[1] - offset, map_y + MAP_Y_OFFSET
+    elif coast_side == "west" and coast:
+        return coast[0] + offset, map_y + MAP_Y_OFFSET
     return x, y
 
 
@@ -257,8 +245,8 @@ hooghly_px = [geo_to_pixel(lat, lon) for lat, lon in hooghly_geo]
 # Clip last point to coastline
 lx, ly = hooghly_px[-1]
 map_ly = ly - MAP_Y_OFFSET
-if map_ly in east_coast_px:
-    coast_x = east_coast_px[map_ly]
+if COAST.row(map_ly):
+    coast_x = COAST.row(map_ly)[1]
     if lx > coast_x:
         hooghly_px[-1] = (coast_x - 20, ly)
 
@@ -491,7 +479,7 @@ draw.line([(div_x, PANEL_TOP), (div_x, CANVAS_H - 40)],
 result = Image.alpha_composite(canvas, overlay)
 result = result.convert("RGB")
 output_path = "/Users/sahanavasanth/Desktop/mapEditingTool/european-trading-posts-1600-1750.png"
-result.save(output_path, "PNG", quality=95)
+save_image(result, output_path, "production")
 print(f"\nMap saved to: {output_path}")
 print(f"Canvas size: {CANVAS_W} x {CANVAS_H}")
 print(f"Total posts: {len(trading_posts)}")
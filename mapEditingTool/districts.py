@@ -0,0 +1,190 @@
+"""
+Batch extraction and overlay of the Madras Presidency districts on worker processes.
+
+The extract_* scripts flood-fill and render their districts one after
+another. extract_districts() instead hands each district to a process pool.
+Workers share the Madras pixels, which are sent once per worker, and return
+the filled region bit-packed with np.packbits. composite_districts() then
+splits the princely-map window the districts cover into square tiles. Each
+worker draws every district onto its tile with render_districts(), and the
+tiles are pasted back. The result is pixel-identical to one render_districts()
+call on the whole map.
+
+MADRAS_DISTRICTS numbers the districts as the source map labels them. Each
+entry has a name and seed pixels; Madras city (12) is only a few pixels of
+label text on the source, so it has no seed.
+
+Scripts that use the pools must keep their top-level work under
+`if __name__ == '__main__':`, because worker processes re-import the main
+module when they start.
+
+Usage:
+    from districts import MADRAS_DISTRICTS, composite_districts, extract_districts
+
+    specs = [MADRAS_DISTRICTS[n] for n in (16, 19, 17, 26)]
+    regions = extract_districts(madras_pixels, specs)
+    composite_districts(princely_pixels, list(zip(regions, styles)),
+                        offset=(2470, 3410), scale=3.6)
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+from floodfill import Region, fill_region_holes, flood_fill_gray, merge_regions
+from hatching import render_districts
+
+TILE_SIZE = 1024
+
+
+class DistrictSpec(NamedTuple):
+    """A district on the Madras map and the seed pixels its parts fill from."""
+    name: str
+    seeds: tuple
+    max_hole_size: int = 500
+
+
+# Numbered as on the Madras map; seeds from find_districts.py
+MADRAS_DISTRICTS = {
+    1: DistrictSpec('Anantapur', ((210, 415),)),
+    2: DistrictSpec('Bellary', ((200, 372),)),
+    3: DistrictSpec('Chingleput', ((357, 501),)),
+    4: DistrictSpec('Chittoor', ((276, 484),)),
+    5: DistrictSpec('Cuddapah', ((291, 416),)),
+    6: DistrictSpec('Ganjam', ((570, 119),)),
+    7: DistrictSpec('East Godavari', ((407, 244),)),
+    8: DistrictSpec('West Godavari', ((413, 301),)),
+    9: DistrictSpec('Guntur', ((364, 326),)),
+    10: DistrictSpec('Kistna', ((390, 306),)),
+    11: DistrictSpec('Kurnool', ((328, 355),)),
+    13: DistrictSpec('Malabar', ((95, 581),)),
+    14: DistrictSpec('Nellore', ((331, 373),)),
+    15: DistrictSpec('Nilgiris', ((157, 615),)),
+    16: DistrictSpec('North Arcot', ((330, 534),)),
+    17: DistrictSpec('Ramnad', ((269, 697),)),
+    18: DistrictSpec('Salem', ((235, 549),)),
+    19: DistrictSpec('South Arcot', ((318, 573),)),
+    20: DistrictSpec('South Kanara', ((50, 487),)),
+    21: DistrictSpec('Tanjore', ((345, 636),)),
+    22: DistrictSpec('Tinnevelly', ((207, 750),)),
+    23: DistrictSpec('Vizagapatam', ((564, 192),)),
+    24: DistrictSpec('Trichinopoly', ((294, 627),)),
+    25: DistrictSpec('Coimbatore', ((209, 581),)),
+    26: DistrictSpec('Madurai', ((252, 667),)),
+}
+
+
+# --- Compact masks for passing regions between processes ---
+def pack_region(region):
+    """(bbox, bit-packed mask bytes) of a Region; about an eighth of its pickled size."""
+    return region.bbox, np.packbits(region.mask, axis=None).tobytes()
+
+
+def unpack_region(packed):
+    """Inverse of pack_region()."""
+    bbox, bits = packed
+    x0, y0, x1, y1 = bbox
+    h, w = y1 - y0, x1 - x0
+    mask = np.unpackbits(np.frombuffer(bits, dtype=np.uint8), count=h * w).reshape(h, w)
+    return Region(mask.astype(bool), tuple(bbox))
+
+
+def _workers(jobs, workers):
+    return max(1, min(jobs, workers or os.cpu_count() or 1))
+
+
+# --- Extraction ---
+_source = None
+
+
+def _set_source(pixels):
+    global _source
+    _source = pixels
+
+
+def _extract(spec):
+    parts = [fill_region_holes(flood_fill_gray(_source, x, y), max_hole_size=spec.max_hole_size)[0]
+             for x, y in spec.seeds]
+    return pack_region(merge_regions(parts))
+
+
+def extract_districts(madras_pixels, specs, workers=None):
+    """
+    Flood-fill and hole-fill every DistrictSpec on the Madras map.
+
+    A district with several seeds is the union of their fills. Runs on up to
+    `workers` processes (default: the CPU count); workers=1 runs in this
+    process. Returns a Region per spec, in order.
+    """
+    workers = _workers(len(specs), workers)
+    if workers == 1:
+        _set_source(madras_pixels)
+        return [unpack_region(_extract(spec)) for spec in specs]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_set_source,
+                             initargs=(madras_pixels,)) as pool:
+        return [unpack_region(packed) for packed in pool.map(_extract, specs)]
+
+
+# --- Compositing ---
+_overlay = None
+
+
+def _set_overlay(packed_districts, offset, scale, dash, gap):
+    global _overlay
+    districts = [(unpack_region(packed), style) for packed, style in packed_districts]
+    _overlay = (districts, offset, scale, dash, gap)
+
+
+def _render_tile(tile, origin):
+    districts, offset, scale, dash, gap = _overlay
+    render_districts(tile, districts, offset, scale, dash=dash, gap=gap, origin=origin)
+    return tile
+
+
+def overlay_window(districts, offset, scale, shape):
+    """The (x0, y0, x1, y1) map window render_districts() would touch, or None."""
+    boxes = [r.bbox for r, _ in districts if r.mask.size]
+    if not boxes:
+        return None
+    ox, oy = offset
+    h, w = shape[:2]
+    x0 = max(0, int(ox + min(b[0] for b in boxes) * scale) - 1)
+    y0 = max(0, int(oy + min(b[1] for b in boxes) * scale) - 1)
+    x1 = min(w, int(ox + max(b[2] for b in boxes) * scale) + 1)
+    y1 = min(h, int(oy + max(b[3] for b in boxes) * scale) + 1)
+    return (x0, y0, x1, y1) if x0 < x1 and y0 < y1 else None
+
+
+def composite_districts(canvas, districts, offset, scale, dash=4, gap=3,
+                        tile_size=TILE_SIZE, workers=None):
+    """
+    render_districts() split by output tiles across worker processes.
+
+    Each tile is sent with a one-pixel margin so border dots on its edge
+    match the single-pass render, and only its interior is pasted back.
+    Returns the (x0, y0, x1, y1) map window that was touched, or None.
+    """
+    window = overlay_window(districts, offset, scale, canvas.shape)
+    if window is None:
+        return None
+    x0, y0, x1, y1 = window
+    h, w = canvas.shape[:2]
+    tiles = [(tx, ty, min(tx + tile_size, x1), min(ty + tile_size, y1))
+             for ty in range(y0, y1, tile_size) for tx in range(x0, x1, tile_size)]
+    workers = _workers(len(tiles), workers)
+    if workers == 1:
+        return render_districts(canvas, districts, offset, scale, dash=dash, gap=gap)
+
+    # Tiles with their margin, clipped to the map
+    halos = [(max(0, tx0 - 1), max(0, ty0 - 1), min(w, tx1 + 1), min(h, ty1 + 1))
+             for tx0, ty0, tx1, ty1 in tiles]
+    packed = [(pack_region(r), style) for r, style in districts if r.mask.size]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_set_overlay,
+                             initargs=(packed, offset, scale, dash, gap)) as pool:
+        rendered = pool.map(_render_tile,
+                            [canvas[hy0:hy1, hx0:hx1].copy() for hx0, hy0, hx1, hy1 in halos],
+                            [(hx0, hy0) for hx0, hy0, _, _ in halos])
+        for (tx0, ty0, tx1, ty1), (hx0, hy0, _, _), tile in zip(tiles, halos, rendered):
+            canvas[ty0:ty1, tx0:tx1] = tile[ty0 - hy0:ty1 - hy0, tx0 - hx0:tx1 - hx0]
+    return window
@@ -0,0 +1,31 @@
+"""
+Export the region-id sidecar (regionmap.export_sidecar) next to each map the
+web app highlights, so a click looks ids up instead of scanning every pixel.
+
+Re-run after any script that edits these PNGs; the app falls back to the
+pixel scan when a sidecar is missing or was exported from another version
+of the map (its recorded SHA-256 differs from the PNG's).
+"""
+from PIL import Image
+import numpy as np
+
+from regionmap import RegionMap, export_sidecar, state_table
+
+APP = '/Users/sahanavasanth/Desktop/LavenderCoinApp'
+
+# (map in public/maps, color mappings snapshot in Backup)
+MAPS = [
+    ('princely-states', 'princely-states-map-colors.json'),
+    ('presidencies-map', 'presidencies-map-colors.json'),
+]
+
+for name, colors_json in MAPS:
+    print(f"Exporting region sidecar for {name}.png...")
+    map_path = f'{APP}/public/maps/{name}.png'
+    pixels = np.array(Image.open(map_path).convert('RGB'))
+    region_map = RegionMap.from_rgb(pixels, state_table(f'{APP}/Backup/{colors_json}', pixels))
+    png_path, index_path = export_sidecar(region_map, f'{APP}/public/maps/{name}', map_path)
+    print(f"  Saved {png_path}")
+    print(f"  Saved {index_path}")
+
+print("Done!")
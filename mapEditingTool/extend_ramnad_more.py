@@ -2,111 +2,65 @@
 Extend Ramnad:
 1. Fill small peach gaps adjacent to existing Ramnad blue
 2. Extend slightly south (user said "just a little")
-Uses flood fill from existing Ramnad pixels, limited to avoid eating all of Madras Presidency.
+Grows from existing Ramnad pixels (grow.grow_region), limited to avoid eating all of Madras Presidency.
+The growth is found on every map variant that has Ramnad (presidencies-map.png
+today) and painted onto the variants it was found on.
 """
-from PIL import Image
-import numpy as np
-from collections import deque
+from floodfill import region_from_mask
+from grow import grow_region
+from hatching import HatchStyle
+from palette import map_palette
+from variants import edit_variants, variant_paths
 
 RAMNAD_FILL = (50, 140, 220)
 RAMNAD_STRIPE = (30, 100, 170)
 RAMNAD_BOUNDARY = (30, 90, 160)
 STRIPE_SPACING = 8
 STRIPE_WIDTH = 3
+RAMNAD = HatchStyle(fill=RAMNAD_FILL, stripe=RAMNAD_STRIPE, border=RAMNAD_BOUNDARY,
+                    spacing=STRIPE_SPACING, width=STRIPE_WIDTH)
+MAX_DISTANCE = 30
+SOUTH_REACH = 40
 
-PEACH_FILL = (255, 200, 180)
-PEACH_BORDER = (200, 120, 100)
+# Peach (Madras Presidency) and Ramnad colors match within 9 per channel
+palette = map_palette(tolerance=9)
 
-def is_peach(r, g, b):
-    return ((abs(int(r) - PEACH_FILL[0]) < 10 and abs(int(g) - PEACH_FILL[1]) < 10 and abs(int(b) - PEACH_FILL[2]) < 10) or
-            (abs(int(r) - PEACH_BORDER[0]) < 10 and abs(int(g) - PEACH_BORDER[1]) < 10 and abs(int(b) - PEACH_BORDER[2]) < 10))
+# Ramnad is roughly x:3240-3620, y:5920-6140; the growth reads only this expanded window
+WINDOW = (3200, 5880, 3650, 6180)
 
-def is_ramnad(r, g, b):
-    for color in [RAMNAD_FILL, RAMNAD_STRIPE, RAMNAD_BOUNDARY]:
-        if abs(int(r) - color[0]) < 10 and abs(int(g) - color[1]) < 10 and abs(int(b) - color[2]) < 10:
-            return True
-    return False
+MAPS_DIR = '/Users/sahanavasanth/Desktop/LavenderCoinApp/public/maps'
 
-def process_map(path):
-    img = Image.open(path).convert('RGB')
-    pixels = np.array(img)
 
+def ramnad_growth(pixels):
+    """The peach pixels Ramnad grows into, as a Region (empty if there is no Ramnad)."""
     # Step 1: Find all current Ramnad pixels in the region
-    # Ramnad is roughly x:3240-3620, y:5920-6140
-    y_min, y_max = 5880, 6180  # expanded region
-    x_min, x_max = 3200, 3650
+    x_min, y_min, x_max, y_max = WINDOW
 
-    ramnad_pixels = set()
-    for y in range(y_min, min(y_max, pixels.shape[0])):
-        for x in range(x_min, min(x_max, pixels.shape[1])):
-            r, g, b = pixels[y, x]
-            if is_ramnad(r, g, b):
-                ramnad_pixels.add((y, x))
+    window = pixels[y_min:y_max, x_min:x_max]
+    ramnad = region_from_mask(palette.mask(window, 'ramnad*'), origin=(x_min, y_min))
 
-    print(f"  Found {len(ramnad_pixels)} existing Ramnad pixels")
+    print(f"  Found {ramnad.area} existing Ramnad pixels")
+    if not ramnad.area:
+        return ramnad
 
     # Find current south boundary
-    current_south = max(y for y, x in ramnad_pixels)
+    current_south = ramnad.bbox[3] - 1
     print(f"  Current southernmost Ramnad pixel: y={current_south}")
 
-    # Step 2: BFS flood fill from Ramnad edges into adjacent peach
+    # Step 2: Grow from Ramnad into adjacent peach
     # Limit: don't go more than 40px south of current boundary
-    south_limit = current_south + 40
-    print(f"  South limit: y={south_limit}")
+    print(f"  South limit: y={current_south + SOUTH_REACH}")
 
-    queue = deque()
-    visited = set()
-    filled = set()
-
-    # Seed the queue with all Ramnad pixels
-    for (y, x) in ramnad_pixels:
-        queue.append((y, x, 0))  # (y, x, distance from ramnad)
-        visited.add((y, x))
-
-    # BFS: expand into peach neighbors
     # Max distance from original Ramnad edge: 30px (to avoid eating too much)
-    MAX_DISTANCE = 30
-
-    while queue:
-        y, x, dist = queue.popleft()
-
-        for dy, dx in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            ny, nx = y + dy, x + dx
-            if (ny, nx) in visited:
-                continue
-            if ny < y_min or ny >= min(y_max, pixels.shape[0]):
-                continue
-            if nx < x_min or nx >= min(x_max, pixels.shape[1]):
-                continue
-            if ny > south_limit:
-                continue
-
-            visited.add((ny, nx))
-            r, g, b = pixels[ny, nx]
-
-            if is_peach(r, g, b):
-                new_dist = dist + 1
-                if new_dist <= MAX_DISTANCE:
-                    filled.add((ny, nx))
-                    queue.append((ny, nx, new_dist))
-
-    print(f"  Filling {len(filled)} additional peach pixels")
-
-    # Apply Ramnad colors
-    for (y, x) in filled:
-        if (x + y) % STRIPE_SPACING < STRIPE_WIDTH:
-            pixels[y, x] = RAMNAD_STRIPE
-        else:
-            pixels[y, x] = RAMNAD_FILL
-
-    result = Image.fromarray(pixels)
-    result.save(path)
-    print(f"  Saved {path}")
-
-print("Extending Ramnad on princely-states.png...")
-process_map('/Users/sahanavasanth/Desktop/LavenderCoinApp/public/maps/princely-states.png')
-
-print("Extending Ramnad on presidencies-map.png...")
-process_map('/Users/sahanavasanth/Desktop/LavenderCoinApp/public/maps/presidencies-map.png')
-
-print("Done!")
+    return grow_region(pixels, ramnad,
+                       lambda px: palette.mask(px, 'peach', 'peach_border'),
+                       max_distance=MAX_DISTANCE, reach={'south': SOUTH_REACH},
+                       bounds=(x_min, y_min, x_max, y_max))
+
+
+if __name__ == '__main__':
+    # Variants with the same classes around Ramnad grow once; variants without Ramnad are left alone
+    paths = variant_paths(MAPS_DIR)
+    print(f"Extending Ramnad on {len(paths)} maps...")
+    edit_variants(ramnad_growth, RAMNAD, paths, WINDOW, palette, only=(9, ('peach', 'peach_border')))
+    print("Done!")
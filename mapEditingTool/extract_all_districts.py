@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Extract every Madras Presidency district and overlay all of them, hatched, on
+the princely states map, using all cores (districts.py).
+
+Districts that already have colors on the maps (Arcot, Madurai, Ramnad,
+Tanjore) keep them; the rest get evenly spaced hues. With ALIGNMENT =
+'georef' the districts are warped through both maps' georeferencing
+(warp.py, grid cached after the first run); with 'calibration' they are
+scaled by OVERLAY_X/Y/SCALE and composited tile by tile on all cores.
+Writes a preview only.
+"""
+import colorsys
+import time
+
+from districts import MADRAS_DISTRICTS, composite_districts, extract_districts
+from georef import Georef
+from hatching import BOUNDARY_SHADE, STRIPE_SHADE, HatchStyle, shade
+from mapio import load_image, save_image
+from palette import MAP_COLORS
+from warp import GeorefTransfer, render_warped, warp_grid
+
+# --- Config ---
+ALIGNMENT = 'georef'        # or 'calibration'
+OVERLAY_X = 2470
+OVERLAY_Y = 3410
+OVERLAY_SCALE = 3.6
+
+STRIPE_WIDTH = 6
+STRIPE_SPACING = 18
+DOT_LENGTH = 4
+GAP_LENGTH = 3
+
+# District number -> MAP_COLORS class it is already drawn with
+KNOWN_COLORS = {16: 'arcot', 19: 'arcot', 26: 'madurai', 17: 'ramnad', 21: 'tanjore'}
+
+madras_path = "/Users/sahanavasanth/Desktop/LavenderCoinApp/mapEditingTool/The-Madras-Presidency-with-its-26-districts-1-Anantapur-2-Bellary-3-Chingleput.png"
+princely_path = "/Users/sahanavasanth/Desktop/LavenderCoinApp/public/maps/princely-states.png"
+princely_georef_path = "/Users/sahanavasanth/Desktop/LavenderCoinApp/public/maps/princely-states.georef.json"
+output_path = "/Users/sahanavasanth/Desktop/LavenderCoinApp/mapEditingTool/test-all-districts-overlay.png"
+
+
+def district_style(number, hue):
+    name = KNOWN_COLORS.get(number)
+    if name:
+        fill, stripe, border = (MAP_COLORS[name], MAP_COLORS[f'{name}_stripe'],
+                                MAP_COLORS[f'{name}_boundary'])
+    else:
+        fill = tuple(int(c * 255) for c in colorsys.hsv_to_rgb(hue, 0.55, 0.9))
+        stripe, border = shade(fill, STRIPE_SHADE), shade(fill, BOUNDARY_SHADE)
+    return HatchStyle(fill, stripe, border, spacing=STRIPE_SPACING, width=STRIPE_WIDTH)
+
+
+if __name__ == '__main__':
+    madras_pixels = load_image(madras_path)
+    result_pixels = load_image(princely_path)
+    numbers = sorted(MADRAS_DISTRICTS)
+    print(f"Madras: {madras_pixels.shape[1]}x{madras_pixels.shape[0]}, "
+          f"Princely: {result_pixels.shape[1]}x{result_pixels.shape[0]}")
+
+    started = time.time()
+    regions = extract_districts(madras_pixels, [MADRAS_DISTRICTS[n] for n in numbers])
+    print(f"\nExtracted {len(regions)} districts in {time.time() - started:.1f}s:")
+    for number, region in zip(numbers, regions):
+        print(f"  {number:2d} {MADRAS_DISTRICTS[number].name:15s} {region.area:6d} px")
+
+    started = time.time()
+    styles = [district_style(n, i / len(numbers)) for i, n in enumerate(numbers)]
+    if ALIGNMENT == 'georef':
+        transform = GeorefTransfer(Georef.for_image(madras_path), Georef.load(princely_georef_path))
+        grid = warp_grid(transform, madras_pixels.shape, result_pixels.shape)
+        print(f"\nWarp grid ready in {time.time() - started:.1f}s")
+        window = render_warped(result_pixels, list(zip(regions, styles)), grid,
+                               dash=DOT_LENGTH, gap=GAP_LENGTH)
+    else:
+        window = composite_districts(result_pixels, list(zip(regions, styles)),
+                                     offset=(OVERLAY_X, OVERLAY_Y), scale=OVERLAY_SCALE,
+                                     dash=DOT_LENGTH, gap=GAP_LENGTH)
+    print(f"\nComposited {window} in {time.time() - started:.1f}s")
+
+    save_image(result_pixels, output_path, 'preview')
+    print(f"Saved to: {output_path}")
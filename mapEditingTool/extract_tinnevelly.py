@@ -8,7 +8,11 @@ south of Ramnad (17) and Madurai (26), east of Travancore.
 """
 from PIL import Image
 import numpy as np
-from collections import deque
+
+from contours import boundary_mask
+from floodfill import fill_region_holes, flood_fill_gray
+from hatching import HatchStyle, render_districts
+from mapio import content_hash, save_if_changed, save_image
 
 # --- Config (from user's alignment session) ---
 OVERLAY_X = 2470
@@ -43,146 +47,49 @@ pW, pH = princely_img.size
 madras_pixels = np.array(madras_img)
 print(f"Madras: {mW}x{mH}, Princely: {pW}x{pH}")
 
-# --- Flood fill ---
-def flood_fill_gray(pixels, seed_x, seed_y, w, h):
-    visited = set()
-    district = set()
-    queue = deque([(seed_x, seed_y)])
-    while queue:
-        x, y = queue.popleft()
-        if (x, y) in visited:
-            continue
-        if x < 0 or x >= w or y < 0 or y >= h:
-            continue
-        visited.add((x, y))
-        r, g, b = pixels[y, x]
-        if r < 100 and g < 100 and b < 100:
-            continue
-        if r > 240 and g > 240 and b > 240:
-            continue
-        district.add((x, y))
-        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            nx, ny = x + dx, y + dy
-            if (nx, ny) not in visited:
-                queue.append((nx, ny))
-    return district
-
-def fill_holes_fast(district_set):
-    if not district_set:
-        return district_set, 0
-    min_x = min(p[0] for p in district_set)
-    max_x = max(p[0] for p in district_set)
-    min_y = min(p[1] for p in district_set)
-    max_y = max(p[1] for p in district_set)
-    w = max_x - min_x + 3
-    h = max_y - min_y + 3
-    mask = np.zeros((h, w), dtype=bool)
-    for x, y in district_set:
-        mask[y - min_y + 1, x - min_x + 1] = True
-    exterior = np.zeros_like(mask)
-    queue = deque()
-    for x in range(w):
-        if not mask[0, x]: queue.append((x, 0))
-        if not mask[h-1, x]: queue.append((x, h-1))
-    for y in range(h):
-        if not mask[y, 0]: queue.append((0, y))
-        if not mask[y, w-1]: queue.append((w-1, y))
-    while queue:
-        x, y = queue.popleft()
-        if x < 0 or x >= w or y < 0 or y >= h: continue
-        if exterior[y, x] or mask[y, x]: continue
-        exterior[y, x] = True
-        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            queue.append((x + dx, y + dy))
-    interior = ~mask & ~exterior
-    added = 0
-    filled = set(district_set)
-    for y in range(h):
-        for x in range(w):
-            if interior[y, x]:
-                filled.add((x + min_x - 1, y + min_y - 1))
-                added += 1
-    return filled, added
-
-def get_boundary(pixels_set):
-    boundary = set()
-    for x, y in pixels_set:
-        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            if (x + dx, y + dy) not in pixels_set:
-                boundary.add((x, y))
-                break
-    return boundary
-
 # --- Extract district 22 (Tinnevelly) ---
 # CORRECT seed point: region #33 from find_districts.py scan
 # Center (229, 779), BBox (199,749)-(264,817) - at the very bottom of the map
 print("\nExtracting district 22 (Tinnevelly)...")
 print("  Using corrected seed (207, 750) - southernmost district")
-d22_pixels = flood_fill_gray(madras_pixels, 207, 750, mW, mH)
-print(f"  Initial flood fill: {len(d22_pixels)} px")
+d22 = flood_fill_gray(madras_pixels, 207, 750)
+print(f"  Initial flood fill: {d22.area} px")
 
-d22_pixels, a22 = fill_holes_fast(d22_pixels)
-d22_boundary = get_boundary(d22_pixels)
-print(f"  After hole filling: {len(d22_pixels)} px (+{a22} holes filled)")
-print(f"  Boundary: {len(d22_boundary)} px")
+d22, a22 = fill_region_holes(d22)
+d22_boundary = boundary_mask(d22.mask)
+print(f"  After hole filling: {d22.area} px (+{a22} holes filled)")
+print(f"  Boundary: {np.count_nonzero(d22_boundary)} px")
 
 # Calculate center and bounding box for verification
-if d22_pixels:
-    cx = sum(p[0] for p in d22_pixels) / len(d22_pixels)
-    cy = sum(p[1] for p in d22_pixels) / len(d22_pixels)
-    min_x = min(p[0] for p in d22_pixels)
-    max_x = max(p[0] for p in d22_pixels)
-    min_y = min(p[1] for p in d22_pixels)
-    max_y = max(p[1] for p in d22_pixels)
+if d22.area:
+    ys, xs = np.nonzero(d22.mask)
+    cx = xs.mean() + d22.bbox[0]
+    cy = ys.mean() + d22.bbox[1]
+    min_x, min_y, max_x, max_y = d22.bbox
+    max_x -= 1
+    max_y -= 1
     print(f"  Center: ({int(cx)}, {int(cy)})")
     print(f"  BBox: ({min_x},{min_y})-({max_x},{max_y})")
 
 # --- Draw on map ---
 print("\nDrawing Tinnevelly on princely states map...")
 result_pixels = np.array(princely_img)
+original_hash = content_hash(result_pixels)
+
+TINNEVELLY = HatchStyle(TINNEVELLY_COLOR, TINNEVELLY_STRIPE, TINNEVELLY_BOUNDARY,
+                        spacing=STRIPE_SPACING, width=STRIPE_WIDTH)
 
-def draw_district_hatched(pixels_set, boundary_set, fill_color, stripe_color, border_color):
-    for mx, my in pixels_set:
-        px_s = int(OVERLAY_X + mx * OVERLAY_SCALE)
-        py_s = int(OVERLAY_Y + my * OVERLAY_SCALE)
-        px_e = int(OVERLAY_X + (mx + 1) * OVERLAY_SCALE)
-        py_e = int(OVERLAY_Y + (my + 1) * OVERLAY_SCALE)
-        px_s = max(0, px_s); py_s = max(0, py_s)
-        px_e = min(pW, px_e); py_e = min(pH, py_e)
-        result_pixels[py_s:py_e, px_s:px_e] = fill_color
-
-    # Apply diagonal stripes
-    for mx, my in pixels_set:
-        px_s = int(OVERLAY_X + mx * OVERLAY_SCALE)
-        py_s = int(OVERLAY_Y + my * OVERLAY_SCALE)
-        px_e = int(OVERLAY_X + (mx + 1) * OVERLAY_SCALE)
-        py_e = int(OVERLAY_Y + (my + 1) * OVERLAY_SCALE)
-        px_s = max(0, px_s); py_s = max(0, py_s)
-        px_e = min(pW, px_e); py_e = min(pH, py_e)
-
-        for py in range(py_s, py_e):
-            for px in range(px_s, px_e):
-                if (px + py) % STRIPE_SPACING < STRIPE_WIDTH:
-                    result_pixels[py, px] = stripe_color
-
-    # Draw dotted boundary
-    boundary_list = sorted(boundary_set, key=lambda p: (p[1], p[0]))
-    for idx, (mx, my) in enumerate(boundary_list):
-        if idx % (DOT_LENGTH + GAP_LENGTH) >= DOT_LENGTH:
-            continue
-        px_s = max(0, int(OVERLAY_X + mx * OVERLAY_SCALE) - 1)
-        py_s = max(0, int(OVERLAY_Y + my * OVERLAY_SCALE) - 1)
-        px_e = min(pW, int(OVERLAY_X + (mx + 1) * OVERLAY_SCALE) + 1)
-        py_e = min(pH, int(OVERLAY_Y + (my + 1) * OVERLAY_SCALE) + 1)
-        result_pixels[py_s:py_e, px_s:px_e] = border_color
-
-draw_district_hatched(d22_pixels, d22_boundary, TINNEVELLY_COLOR, TINNEVELLY_STRIPE, TINNEVELLY_BOUNDARY)
+dirty = render_districts(result_pixels, [(d22, TINNEVELLY)], offset=(OVERLAY_X, OVERLAY_Y),
+                         scale=OVERLAY_SCALE, dash=DOT_LENGTH, gap=GAP_LENGTH)
+print(f"  Modified {dirty}")
 
 # Save test output
-Image.fromarray(result_pixels).save(test_output_path)
+save_image(result_pixels, test_output_path, 'preview')
 print(f"\nSaved TEST to: {test_output_path}")
 
-# Also save to production map
-Image.fromarray(result_pixels).save(prod_output_path)
-print(f"Saved PRODUCTION to: {prod_output_path}")
+# Also save to production map (skipped when Tinnevelly was already drawn)
+if save_if_changed(result_pixels, prod_output_path, original_hash):
+    print(f"Saved PRODUCTION to: {prod_output_path}")
+else:
+    print(f"PRODUCTION unchanged, not re-encoding {prod_output_path}")
 print(f"  Tinnevelly: RGB{TINNEVELLY_COLOR} with stripes RGB{TINNEVELLY_STRIPE}")
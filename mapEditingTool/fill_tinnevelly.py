@@ -4,7 +4,10 @@ Fill the southernmost region (Tinnevelly) with Arcot colors.
 """
 from PIL import Image
 import numpy as np
-from collections import deque
+
+from floodfill import flood_fill_color
+from hatching import HatchStyle, paint_hatched
+from mapio import content_hash, save_if_changed
 
 # Arcot/Tinnevelly colors
 TINNEVELLY_COLOR = (0, 190, 180)
@@ -26,31 +29,9 @@ pW, pH = princely_img.size
 print(f"Map size: {pW}x{pH}")
 
 pixels = np.array(princely_img)
+original_hash = content_hash(pixels)
 
-def flood_fill_color(pixels_arr, seed_x, seed_y, target_color, tolerance=15):
-    """Flood fill matching a specific color."""
-    h, w = pixels_arr.shape[:2]
-    visited = set()
-    region = set()
-    queue = deque([(seed_x, seed_y)])
-    tr, tg, tb = target_color
-
-    while queue:
-        x, y = queue.popleft()
-        if (x, y) in visited:
-            continue
-        if x < 0 or x >= w or y < 0 or y >= h:
-            continue
-        visited.add((x, y))
-
-        r, g, b = pixels_arr[y, x]
-        if abs(int(r) - tr) <= tolerance and abs(int(g) - tg) <= tolerance and abs(int(b) - tb) <= tolerance:
-            region.add((x, y))
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nx, ny = x + dx, y + dy
-                if (nx, ny) not in visited:
-                    queue.append((nx, ny))
-    return region
+TINNEVELLY = HatchStyle(TINNEVELLY_COLOR, TINNEVELLY_STRIPE, spacing=STRIPE_SPACING, width=STRIPE_WIDTH)
 
 # Fill the peach/tan region at the southernmost tip
 print("Filling southernmost region (Tinnevelly)...")
@@ -58,19 +39,17 @@ PEACH = (200, 120, 100)
 seed_x, seed_y = 3300, 6350
 
 tinnevelly_region = flood_fill_color(pixels, seed_x, seed_y, PEACH, tolerance=20)
-print(f"  Found region: {len(tinnevelly_region)} pixels")
+print(f"  Found region: {tinnevelly_region.area} pixels")
 
-if len(tinnevelly_region) > 100:
+if tinnevelly_region.area > 100:
     # Apply Arcot colors with diagonal stripes
-    for x, y in tinnevelly_region:
-        if (x + y) % STRIPE_SPACING < STRIPE_WIDTH:
-            pixels[y, x] = TINNEVELLY_STRIPE
-        else:
-            pixels[y, x] = TINNEVELLY_COLOR
+    paint_hatched(pixels, tinnevelly_region, TINNEVELLY)
 
-    print(f"  Colored {len(tinnevelly_region)} pixels with Arcot colors")
-    Image.fromarray(pixels).save(output_path)
-    print(f"\nSaved to: {output_path}")
+    print(f"  Colored {tinnevelly_region.area} pixels with Arcot colors")
+    if save_if_changed(pixels, output_path, original_hash):
+        print(f"\nSaved to: {output_path}")
+    else:
+        print(f"\nNo pixels changed, {output_path} left as is")
     print(f"  Fill: RGB{TINNEVELLY_COLOR}")
     print(f"  Stripe: RGB{TINNEVELLY_STRIPE}")
 else:
@@ -88,13 +67,9 @@ else:
             color = tuple(pixels[sy, sx])
             print(f"  Trying ({sx}, {sy}): RGB{color}")
             region = flood_fill_color(pixels, sx, sy, color, tolerance=20)
-            if len(region) > 1000:
-                print(f"    Found large region: {len(region)} pixels")
-                for x, y in region:
-                    if (x + y) % STRIPE_SPACING < STRIPE_WIDTH:
-                        pixels[y, x] = TINNEVELLY_STRIPE
-                    else:
-                        pixels[y, x] = TINNEVELLY_COLOR
-                Image.fromarray(pixels).save(output_path)
-                print(f"\nSaved to: {output_path}")
+            if region.area > 1000:
+                print(f"    Found large region: {region.area} pixels")
+                paint_hatched(pixels, region, TINNEVELLY)
+                if save_if_changed(pixels, output_path, original_hash):
+                    print(f"\nSaved to: {output_path}")
                 break
@@ -2,16 +2,12 @@
 """
 Scan the area around Arcot/Tanjore to find the peach pocket.
 """
-from PIL import Image
-import numpy as np
+from mapio import cached_image
 
 # Load the test-tanjore-overlay (which has Tanjore already drawn)
 princely_path = "/Users/sahanavasanth/Desktop/LavenderCoinApp/public/maps/princely-states.png"
-princely_raw = Image.open(princely_path).convert('RGBA')
-white_bg = Image.new('RGBA', princely_raw.size, (255, 255, 255, 255))
-princely_img = Image.alpha_composite(white_bg, princely_raw).convert('RGB')
-pixels = np.array(princely_img)
-pW, pH = princely_img.size
+pixels = cached_image(princely_path)
+pH, pW = pixels.shape[:2]
 
 # Wider scan to find peach pixels
 print(f"Map size: {pW}x{pH}")
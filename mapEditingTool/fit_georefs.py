@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Fit the georeferencing of each map (georef.py) and save it next to the map.
+
+- Madras Presidency map: affine, from the 77/82E x 10/15/20N grid-line
+  intersections on the image.
+- Princely states map: cubic, from the coastline-calibrated lon/lat fit that
+  create_trading_posts_map.py used, sampled every degree over the map.
+  princely-states-outline.png and the other variants share it.
+
+Also prints the offset and scale the two fits imply for overlaying the Madras
+map, next to the OVERLAY_X/Y/SCALE constants the extract scripts carry.
+"""
+import numpy as np
+
+from georef import Georef, transfer
+
+madras_path = "/Users/sahanavasanth/Desktop/LavenderCoinApp/mapEditingTool/The-Madras-Presidency-with-its-26-districts-1-Anantapur-2-Bellary-3-Chingleput.png"
+princely_path = "/Users/sahanavasanth/Desktop/LavenderCoinApp/public/maps/princely-states.png"
+
+# (lon, lat): (pixel_x, pixel_y) of the grid-line intersections, measured on the
+# drawn lines (overlay_madras_districts.py's estimates were 30-70 px off)
+MADRAS_REF_POINTS = {
+    (77.0, 20.0): (181.5, 140.5),
+    (82.0, 20.0): (466.5, 140.5),
+    (77.0, 15.0): (181.5, 425.5),
+    (82.0, 15.0): (466.5, 425.5),
+    (77.0, 10.0): (181.5, 710.5),
+    (82.0, 10.0): (466.5, 710.5),
+}
+MADRAS_SIZE = (717, 966)
+
+PRINCELY_SIZE = (7051, 6581)
+PRINCELY_DEGREE = 3
+
+
+def princely_reference(lon, lat):
+    """The trading-posts map calibration, without its title-bar offset."""
+    sx = 190.86 + 0.442 * lat - 0.02105 * lat * lat
+    ox = -11695.4 - 11.51 * lat + 0.976 * lat * lat
+    return sx * lon + ox, (37.0 - lat) * 213.7 + 209
+
+
+# Calibrations the overlay scripts carry: (name, x, y, scale)
+OVERLAY_CALIBRATIONS = [
+    ('extract_arcot_districts / extract_madurai_ramnad', 2576, 3694, 3.2),
+    ('extract_tanjore / extract_tinnevelly', 2470, 3410, 3.6),
+]
+
+madras = Georef.fit(MADRAS_REF_POINTS, degree=1, size=MADRAS_SIZE)
+madras.save(Georef.sidecar_path(madras_path))
+print(f"Madras map: affine, rms {madras.rms:.2f} px -> {Georef.sidecar_path(madras_path)}")
+
+lons, lats = np.meshgrid(np.arange(66.0, 98.0), np.arange(8.0, 38.0))
+xs, ys = princely_reference(lons, lats)
+princely = Georef.fit(list(zip(zip(lons.ravel(), lats.ravel()), zip(xs.ravel(), ys.ravel()))),
+                      degree=PRINCELY_DEGREE, size=PRINCELY_SIZE)
+princely.save(Georef.sidecar_path(princely_path))
+print(f"Princely map: degree {PRINCELY_DEGREE}, rms {princely.rms:.2f} px "
+      f"-> {Georef.sidecar_path(princely_path)}")
+
+# Round trip over the princely map
+px, py = princely.geo_to_pixel(*princely.pixel_to_geo(xs, ys))
+print(f"  pixel -> geo -> pixel error: max {np.hypot(px - xs, py - ys).max():.3f} px")
+
+# Madras pixel -> princely pixel, summarized as offset + scale per axis
+mx, my = np.meshgrid(np.arange(0, MADRAS_SIZE[0], 8.0), np.arange(0, MADRAS_SIZE[1], 8.0))
+tx, ty = transfer(madras, princely, mx, my)
+scale_x, offset_x = np.polyfit(mx.ravel(), tx.ravel(), 1)
+scale_y, offset_y = np.polyfit(my.ravel(), ty.ravel(), 1)
+print(f"\nMadras -> princely overlay implied by the georefs: "
+      f"offset ({offset_x:.0f}, {offset_y:.0f}), scale {scale_x:.2f} x {scale_y:.2f}")
+for name, x, y, scale in OVERLAY_CALIBRATIONS:
+    error = np.hypot(x + mx * scale - tx, y + my * scale - ty)
+    print(f"  {name}: offset ({x}, {y}), scale {scale} "
+          f"-> {error.mean():.0f} px mean / {error.max():.0f} px max from it")
@@ -0,0 +1,373 @@
+"""
+Shared flood-fill engine for the map editing scripts.
+
+Regions are grown one horizontal run at a time (scanline fill) instead of one
+(x, y) tuple at a time, and come back as a boolean mask cropped to the region's
+bounding box. Two pixel predicates cover what the scripts need:
+
+  gray_match()                 -> district interior on the Madras map
+                                  (not a dark boundary, not white background)
+  color_match(color, tol)      -> pixels within +/- tol of a color, per channel
+  between_match(lo, hi)        -> every channel strictly between lo and hi
+
+label_regions() labels every region of a mask at once (int32 label raster plus
+per-region area, centroid, bbox and seed) for scripts that need all districts;
+label_equal_runs() does the same for regions of one color, as runs.
+fill_holes() closes enclosed gaps such as the district number text.
+
+Usage:
+    from floodfill import flood_fill_gray, flood_fill_color
+
+    district = flood_fill_gray(madras_pixels, 330, 534)
+    pocket = flood_fill_color(princely_pixels, 3700, 5700, (255, 200, 180), 10,
+                              bounds=(3600, 5550, 3800, 5850))
+    print(district.area, district.bbox)
+    princely_pixels[pocket.window()][pocket.mask] = (0, 190, 180)
+
+    labels, stats = label_regions(gray_match()(madras_pixels))
+    big = np.flatnonzero(stats.area > 200) + 1     # label ids
+
+    district, added = fill_region_holes(district, max_hole_size=500)
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+
+class Region(NamedTuple):
+    """A filled region: `mask` covers exactly `bbox` = (x0, y0, x1, y1), ends exclusive."""
+    mask: np.ndarray
+    bbox: tuple
+
+    @property
+    def area(self):
+        return int(np.count_nonzero(self.mask))
+
+    def window(self):
+        """Slices selecting the region's bbox from a full-size array."""
+        x0, y0, x1, y1 = self.bbox
+        return np.s_[y0:y1, x0:x1]
+
+    def full_mask(self, shape):
+        """The region as a boolean mask of the given full (h, w) shape."""
+        out = np.zeros(shape[:2], dtype=bool)
+        out[self.window()] = self.mask
+        return out
+
+
+EMPTY_REGION = Region(np.zeros((0, 0), dtype=bool), (0, 0, 0, 0))
+
+
+def region_from_mask(mask, origin=(0, 0)):
+    """Crop a boolean mask to its set pixels; `origin` = (x, y) of mask[0, 0]."""
+    rows = np.flatnonzero(mask.any(axis=1))
+    if not len(rows):
+        return EMPTY_REGION
+    cols = np.flatnonzero(mask.any(axis=0))
+    y0, y1 = int(rows[0]), int(rows[-1]) + 1
+    x0, x1 = int(cols[0]), int(cols[-1]) + 1
+    ox, oy = origin
+    return Region(mask[y0:y1, x0:x1].copy(), (x0 + ox, y0 + oy, x1 + ox, y1 + oy))
+
+
+def merge_regions(regions):
+    """Union of several regions as one Region over their combined bbox."""
+    regions = [r for r in regions if r.mask.size]
+    if not regions:
+        return EMPTY_REGION
+    x0 = min(r.bbox[0] for r in regions)
+    y0 = min(r.bbox[1] for r in regions)
+    x1 = max(r.bbox[2] for r in regions)
+    y1 = max(r.bbox[3] for r in regions)
+    mask = np.zeros((y1 - y0, x1 - x0), dtype=bool)
+    for r in regions:
+        rx0, ry0, rx1, ry1 = r.bbox
+        mask[ry0 - y0:ry1 - y0, rx0 - x0:rx1 - x0] |= r.mask
+    return Region(mask, (x0, y0, x1, y1))
+
+
+# --- Pixel predicates ---
+def gray_match(dark=100, white=240):
+    """Match district interiors: stop at dark boundaries and white background."""
+    def match(px):
+        is_dark = (px[..., 0] < dark) & (px[..., 1] < dark) & (px[..., 2] < dark)
+        is_white = (px[..., 0] > white) & (px[..., 1] > white) & (px[..., 2] > white)
+        return ~(is_dark | is_white)
+    return match
+
+
+def between_match(lo, hi):
+    """Match pixels whose every channel is strictly between `lo` and `hi`."""
+    def match(px):
+        return ((px[..., :3] > lo) & (px[..., :3] < hi)).all(axis=-1)
+    return match
+
+
+def color_match(color, tolerance):
+    """Match pixels whose every channel is within `tolerance` of `color`."""
+    target = np.array(color[:3], dtype=np.int16)
+
+    def match(px):
+        diff = np.abs(px[..., :3].astype(np.int16) - target)
+        return (diff <= tolerance).all(axis=-1)
+    return match
+
+
+# --- Scanline fill ---
+def _row_runs(row_mask, x0):
+    """Start/end (exclusive) x of every run of True in one row."""
+    padded = np.concatenate(([False], row_mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2] + x0, edges[1::2] + x0
+
+
+def runs_to_mask(rows, starts, ends):
+    """Paint (row, start, end) runs into a mask cropped to their bbox."""
+    if len(rows) == 0:
+        return EMPTY_REGION
+    rows = np.asarray(rows)
+    starts = np.asarray(starts)
+    ends = np.asarray(ends)
+    x0, x1 = int(starts.min()), int(ends.max())
+    y0, y1 = int(rows.min()), int(rows.max()) + 1
+    # +1 at each run start, -1 at each run end, then a running sum along x
+    delta = np.zeros((y1 - y0, x1 - x0 + 1), dtype=np.int8)
+    delta[rows - y0, starts - x0] = 1
+    delta[rows - y0, ends - x0] = -1
+    mask = np.cumsum(delta, axis=1, dtype=np.int8)[:, :-1] > 0
+    return Region(mask, (x0, y0, x1, y1))
+
+
+def flood_fill(pixels, seed_x, seed_y, match=None, bounds=None):
+    """
+    4-connected flood fill from (seed_x, seed_y).
+
+    `pixels` is either an (h, w, 3) image tested with `match`, or an (h, w)
+    boolean mask used as-is. `bounds` = (x0, y0, x1, y1) limits the fill.
+    The predicate is evaluated lazily, one row at a time, so only rows the
+    region reaches are ever looked at.
+    """
+    h, w = pixels.shape[:2]
+    bx0, by0, bx1, by1 = bounds if bounds is not None else (0, 0, w, h)
+    bx0, by0 = max(0, bx0), max(0, by0)
+    bx1, by1 = min(w, bx1), min(h, by1)
+    if not (bx0 <= seed_x < bx1 and by0 <= seed_y < by1):
+        return EMPTY_REGION
+
+    row_cache = {}
+
+    def runs(y):
+        if y not in row_cache:
+            row = pixels[y, bx0:bx1]
+            row_mask = row if match is None else match(row)
+            starts, ends = _row_runs(row_mask, bx0)
+            row_cache[y] = (starts, ends, np.zeros(len(starts), dtype=bool))
+        return row_cache[y]
+
+    starts, ends, seen = runs(seed_y)
+    i = np.searchsorted(ends, seed_x, side='right')
+    if i == len(starts) or starts[i] > seed_x:
+        return EMPTY_REGION  # seed itself does not match
+
+    seen[i] = True
+    stack = [(seed_y, int(starts[i]), int(ends[i]))]
+    out_rows, out_starts, out_ends = [], [], []
+
+    while stack:
+        y, s, e = stack.pop()
+        out_rows.append(y)
+        out_starts.append(s)
+        out_ends.append(e)
+        for ny in (y - 1, y + 1):
+            if ny < by0 or ny >= by1:
+                continue
+            n_starts, n_ends, n_seen = runs(ny)
+            # Runs in the neighbour row that overlap [s, e)
+            lo = np.searchsorted(n_ends, s, side='right')
+            hi = np.searchsorted(n_starts, e, side='left')
+            for j in range(lo, hi):
+                if not n_seen[j]:
+                    n_seen[j] = True
+                    stack.append((ny, int(n_starts[j]), int(n_ends[j])))
+
+    return runs_to_mask(out_rows, out_starts, out_ends)
+
+
+def flood_fill_gray(pixels, seed_x, seed_y, bounds=None):
+    """Fill a district on the Madras map, stopping at dark boundaries and white."""
+    return flood_fill(pixels, seed_x, seed_y, gray_match(), bounds)
+
+
+def flood_fill_color(pixels, seed_x, seed_y, target_color, tolerance=15, bounds=None):
+    """Fill the region around the seed whose color is within `tolerance` of `target_color`."""
+    return flood_fill(pixels, seed_x, seed_y, color_match(target_color, tolerance), bounds)
+
+
+# --- Connected-component labeling ---
+class RegionStats(NamedTuple):
+    """Per-region table from label_regions(); row i describes label i + 1."""
+    area: np.ndarray      # (n,) pixel count
+    centroid: np.ndarray  # (n, 2) mean (x, y)
+    bbox: np.ndarray      # (n, 4) x0, y0, x1, y1, ends exclusive
+    seed: np.ndarray      # (n, 2) first (x, y) of the region in raster order
+
+    def __len__(self):
+        return len(self.area)
+
+
+def find_runs(mask):
+    """Every horizontal run of True in a 2-D mask, in raster order: rows, starts, ends (exclusive)."""
+    h, w = mask.shape
+    padded = np.zeros((h, w + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return rows, starts, ends
+
+
+def _link_runs(rows, starts, ends, w):
+    """Pairs (a, b) of runs in consecutive rows whose x-ranges overlap (4-connectivity)."""
+    start_key = rows.astype(np.int64) * (w + 1) + starts
+    end_key = rows.astype(np.int64) * (w + 1) + ends
+    # For run a, the runs b in row + 1 with end_b > start_a and start_b < end_a
+    below = (rows.astype(np.int64) + 1) * (w + 1)
+    lo = np.searchsorted(end_key, below + starts, side='right')
+    hi = np.searchsorted(start_key, below + ends, side='left')
+    counts = np.maximum(hi - lo, 0)
+    a = np.repeat(np.arange(len(rows)), counts)
+    # b = lo[a] + 0, 1, ... counts[a] - 1
+    offsets = np.arange(len(a)) - np.repeat(np.cumsum(counts) - counts, counts)
+    b = np.repeat(lo, counts) + offsets
+    return a, b
+
+
+def _union_roots(n, a, b):
+    """Root (smallest run index) of each run's component, by hooking and pointer jumping."""
+    parent = np.arange(n)
+    while True:
+        ra, rb = parent[a], parent[b]
+        differ = ra != rb
+        if not differ.any():
+            return parent
+        lo = np.minimum(ra[differ], rb[differ])
+        hi = np.maximum(ra[differ], rb[differ])
+        np.minimum.at(parent, hi, lo)
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+
+def label_regions(mask):
+    """
+    Label the 4-connected regions of a boolean mask in one pass.
+
+    Returns (labels, stats): an int32 raster with 0 for background and 1..n
+    for regions numbered in raster order of their first pixel, and a
+    RegionStats table computed with bincount-style reductions over runs.
+    """
+    h, w = mask.shape
+    rows, starts, ends = find_runs(mask)
+    labels = np.zeros((h, w), dtype=np.int32)
+    if len(rows) == 0:
+        empty = np.zeros((0, 2))
+        return labels, RegionStats(np.zeros(0, dtype=np.int64), empty,
+                                   np.zeros((0, 4), dtype=np.int64), empty.astype(np.int64))
+
+    a, b = _link_runs(rows, starts, ends, w)
+    roots = _union_roots(len(rows), a, b)
+    # Roots are the earliest run of each region, so this keeps raster order
+    root_ids, run_label = np.unique(roots, return_inverse=True)
+    run_label = run_label.astype(np.int32) + 1
+    n = len(root_ids)
+
+    # Paint: +label at each run start, -label at each run end, cumulative sum along x
+    delta = np.zeros((h, w + 1), dtype=np.int32)
+    delta[rows, starts] = run_label
+    delta[rows, ends] = -run_label
+    np.cumsum(delta[:, :-1], axis=1, out=labels)
+
+    lengths = (ends - starts).astype(np.float64)
+    area = np.bincount(run_label, weights=lengths, minlength=n + 1)[1:]
+    sum_x = np.bincount(run_label, weights=lengths * (starts + ends - 1) / 2, minlength=n + 1)[1:]
+    sum_y = np.bincount(run_label, weights=lengths * rows, minlength=n + 1)[1:]
+
+    bbox = np.empty((n, 4), dtype=np.int64)
+    bbox[:, 0] = w
+    bbox[:, 2] = 0
+    np.minimum.at(bbox[:, 0], run_label - 1, starts)
+    np.maximum.at(bbox[:, 2], run_label - 1, ends)
+    bbox[:, 1] = rows[root_ids]
+    bbox[:, 3] = 0
+    np.maximum.at(bbox[:, 3], run_label - 1, rows + 1)
+
+    seed = np.stack([starts[root_ids], rows[root_ids]], axis=1).astype(np.int64)
+    centroid = np.stack([sum_x / area, sum_y / area], axis=1)
+    return labels, RegionStats(area.astype(np.int64), centroid, bbox, seed)
+
+
+def label_equal_runs(values):
+    """
+    Label the 4-connected regions of equal value in a 2-D array (e.g. packed colors).
+
+    Returns (rows, starts, ends, run_label): every maximal horizontal run of
+    one value in raster order, tiling the whole array, and the region of each
+    run, 0..n-1 numbered in raster order of the region's first pixel.
+    """
+    h, w = values.shape
+    change = np.ones((h, w), dtype=bool)
+    change[:, 1:] = values[:, 1:] != values[:, :-1]
+    rows, starts = np.nonzero(change)
+    ends = np.empty_like(starts)
+    ends[:-1] = starts[1:]
+    # The last run of every row ends at the right edge
+    ends[np.searchsorted(rows, np.arange(1, h + 1)) - 1] = w
+
+    a, b = _link_runs(rows, starts, ends, w)
+    same = values[rows[a], starts[a]] == values[rows[b], starts[b]]
+    roots = _union_roots(len(rows), a[same], b[same])
+    _, run_label = np.unique(roots, return_inverse=True)
+    return rows, starts, ends, run_label.astype(np.int32)
+
+
+def region_from_label(labels, stats, label):
+    """Cut one labelled region out of the raster as a Region."""
+    x0, y0, x1, y1 = (int(v) for v in stats.bbox[label - 1])
+    return Region(labels[y0:y1, x0:x1] == label, (x0, y0, x1, y1))
+
+
+def labels_touching(labels, mask):
+    """Boolean flag per label id (index 0 = background): does the region contain any `mask` pixel?"""
+    hit = np.bincount(labels[mask], minlength=int(labels.max()) + 1)
+    return hit > 0
+
+
+# --- Hole filling ---
+def fill_holes(mask, max_hole_size=500):
+    """
+    Fill the enclosed holes of a mask.
+
+    The background is labelled once; the component touching the (padded)
+    border is the exterior and every other component is a hole. Only holes
+    smaller than `max_hole_size` pixels are filled (the number text inside a
+    district); pass None to fill all of them. Returns (filled_mask, added).
+    """
+    h, w = mask.shape
+    background = np.ones((h + 2, w + 2), dtype=bool)
+    background[1:-1, 1:-1] = ~mask
+    labels, stats = label_regions(background)
+    # Label 1 is the exterior: it owns the first pixel in raster order, (0, 0)
+    fill = np.zeros(len(stats) + 1, dtype=bool)
+    fill[2:] = True
+    if max_hole_size is not None:
+        fill[2:] &= stats.area[1:] < max_hole_size
+    holes = fill[labels[1:-1, 1:-1]]
+    return mask | holes, int(np.count_nonzero(holes))
+
+
+def fill_region_holes(region, max_hole_size=500):
+    """fill_holes() for a Region; returns (region, added)."""
+    mask, added = fill_holes(region.mask, max_hole_size)
+    return Region(mask, region.bbox), added
@@ -0,0 +1,156 @@
+"""
+Georeferencing: fitted transforms between (lon, lat) and map pixels.
+
+Each script used to carry its own conversion: the Madras overlay a linear
+66-97E / 8-37N box, create_trading_posts_map.py a hand-fitted quadratic, and
+the extract scripts OVERLAY_X/Y/SCALE constants. A Georef is fitted once by
+least squares from control points, such as grid-line intersections read off
+the map. It is affine at degree 1 and a polynomial in lon and lat above
+that. It is saved as a <image>.georef.json sidecar next to its map, and
+every script loads the same one.
+
+Both directions are fitted, and both take and return whole NumPy arrays.
+Above degree 1 the pixel -> geo fit is made on a dense sample of the geo ->
+pixel fit over the control points' extent and then refined against the
+forward fit, so it is only meant for use inside that extent.
+
+Usage:
+    from georef import Georef, transfer
+
+    madras = Georef.fit({(77.0, 20.0): (181.5, 140.5), (82.0, 20.0): (466.5, 140.5),
+                         (77.0, 10.0): (181.5, 710.5), (82.0, 10.0): (466.5, 710.5)})
+    madras.save(Georef.sidecar_path(madras_path))
+
+    princely = Georef.for_image(princely_path)
+    x, y = princely.geo_to_pixel(lons, lats)
+    px, py = transfer(madras, princely, mx, my)     # Madras pixel -> princely pixel
+"""
+import json
+import os
+
+import numpy as np
+
+INVERSE_SAMPLES = 32    # per axis, for fitting the inverse of a polynomial
+REFINE_STEPS = 3        # fixed-point corrections of that inverse
+
+
+def _terms(u, v, degree):
+    """Monomials u**i * v**j with i + j <= degree, as the last axis."""
+    return np.stack([u ** (d - j) * v ** j for d in range(degree + 1) for j in range(d + 1)], axis=-1)
+
+
+def _norm_of(points):
+    """(center_x, center_y, scale_x, scale_y) mapping points into about [-1, 1]."""
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    half = np.where(hi > lo, (hi - lo) / 2, 1.0)
+    return np.concatenate([(lo + hi) / 2, half])
+
+
+def _fit(src, dst, degree):
+    """Least-squares polynomial src -> dst: (normalization of src, (n_terms, 2) coefficients)."""
+    norm = _norm_of(src)
+    u = (src - norm[:2]) / norm[2:]
+    terms = _terms(u[:, 0], u[:, 1], degree)
+    if len(src) < terms.shape[1]:
+        raise ValueError(f"A degree {degree} fit needs at least {terms.shape[1]} control points, "
+                         f"got {len(src)}")
+    coeffs, *_ = np.linalg.lstsq(terms, dst, rcond=None)
+    return norm, coeffs
+
+
+def _apply(norm, coeffs, degree, a, b):
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64))
+    out = _terms((a - norm[0]) / norm[2], (b - norm[1]) / norm[3], degree) @ coeffs
+    return out[..., 0], out[..., 1]
+
+
+class Georef:
+    """Polynomial transform between geographic (lon, lat) and pixel (x, y) coordinates."""
+
+    def __init__(self, degree, geo_norm, to_pixel, pixel_norm, to_geo, rms=0.0, size=None):
+        self.degree = degree
+        self.geo_norm = np.asarray(geo_norm, dtype=np.float64)
+        self.to_pixel = np.asarray(to_pixel, dtype=np.float64)
+        self.pixel_norm = np.asarray(pixel_norm, dtype=np.float64)
+        self.to_geo = np.asarray(to_geo, dtype=np.float64)
+        self.rms = rms          # pixel residual of the fit at the control points
+        self.size = tuple(size) if size is not None else None    # (w, h) of the map
+
+    @classmethod
+    def fit(cls, control_points, degree=1, size=None):
+        """
+        Fit from control points: a {(lon, lat): (x, y)} dict or a list of
+        ((lon, lat), (x, y)) pairs. Degree 1 is affine.
+        """
+        pairs = list(control_points.items() if isinstance(control_points, dict) else control_points)
+        geo = np.array([g for g, _ in pairs], dtype=np.float64)
+        pixel = np.array([p for _, p in pairs], dtype=np.float64)
+        geo_norm, to_pixel = _fit(geo, pixel, degree)
+
+        # The inverse is fitted on a dense sample of the forward fit
+        lo, hi = geo.min(axis=0), geo.max(axis=0)
+        lons, lats = np.meshgrid(np.linspace(lo[0], hi[0], INVERSE_SAMPLES),
+                                 np.linspace(lo[1], hi[1], INVERSE_SAMPLES))
+        sample_geo = np.concatenate([geo, np.stack([lons.ravel(), lats.ravel()], axis=-1)])
+        sample_pixel = np.stack(_apply(geo_norm, to_pixel, degree, sample_geo[:, 0], sample_geo[:, 1]),
+                                axis=-1)
+        pixel_norm, to_geo = _fit(sample_pixel, sample_geo, degree)
+
+        georef = cls(degree, geo_norm, to_pixel, pixel_norm, to_geo, size=size)
+        x, y = georef.geo_to_pixel(geo[:, 0], geo[:, 1])
+        georef.rms = float(np.sqrt(np.mean((x - pixel[:, 0]) ** 2 + (y - pixel[:, 1]) ** 2)))
+        return georef
+
+    def geo_to_pixel(self, lon, lat):
+        """(x, y) float arrays for lon/lat arrays (or scalars)."""
+        return _apply(self.geo_norm, self.to_pixel, self.degree, lon, lat)
+
+    def pixel_to_geo(self, x, y):
+        """(lon, lat) float arrays for pixel x/y arrays (or scalars)."""
+        lon, lat = guess_lon, guess_lat = _apply(self.pixel_norm, self.to_geo, self.degree, x, y)
+        # Above degree 1 the fitted inverse is approximate: correct it against the forward fit
+        for _ in range(REFINE_STEPS if self.degree > 1 else 0):
+            back_lon, back_lat = _apply(self.pixel_norm, self.to_geo, self.degree,
+                                        *self.geo_to_pixel(lon, lat))
+            lon, lat = lon + guess_lon - back_lon, lat + guess_lat - back_lat
+        return lon, lat
+
+    # --- Sidecar files ---
+    @staticmethod
+    def sidecar_path(image_path):
+        return os.path.splitext(image_path)[0] + '.georef.json'
+
+    @classmethod
+    def for_image(cls, image_path):
+        """The Georef saved next to a map image."""
+        return cls.load(cls.sidecar_path(image_path))
+
+    def to_json(self):
+        return {
+            'degree': self.degree,
+            'size': list(self.size) if self.size else None,
+            'rms': round(self.rms, 4),
+            'geo_norm': self.geo_norm.tolist(),
+            'to_pixel': self.to_pixel.tolist(),
+            'pixel_norm': self.pixel_norm.tolist(),
+            'to_geo': self.to_geo.tolist(),
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data['degree'], data['geo_norm'], data['to_pixel'], data['pixel_norm'],
+                   data['to_geo'], rms=data.get('rms', 0.0), size=data.get('size'))
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_json(), f, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_json(json.load(f))
+
+
+def transfer(src, dst, x, y):
+    """Pixel coordinates on the map of `src` -> pixel coordinates on the map of `dst`."""
+    return dst.geo_to_pixel(*src.pixel_to_geo(x, y))
@@ -0,0 +1,117 @@
+"""
+Bounded region growing: extend one region into neighbouring pixels of another class.
+
+grow_region() replaces the tuple BFS the extend scripts used ("grow Ramnad into
+adjacent peach, at most 30 px, no further than 40 px south"). It runs a
+constrained dilation on masks: each step adds the 4-neighbours of the last
+step's new pixels that match, so after k steps every added pixel lies at
+geodesic distance <= k from the seed, exactly as the BFS found them. Only the
+window the growth can reach is read and classified, and each step only looks
+at the bounding box of the current frontier, so a call on the full map costs
+about as much as the area it grows into.
+
+Usage:
+    from floodfill import region_from_mask
+    from grow import grow_region
+    from palette import map_palette
+
+    palette = map_palette(tolerance=9)
+    ramnad = region_from_mask(palette.mask(pixels, 'ramnad*'))
+    added = grow_region(pixels, ramnad,
+                        lambda px: palette.mask(px, 'peach', 'peach_border'),
+                        max_distance=30, reach={'south': 40})
+    paint_hatched(pixels, added, RAMNAD)
+"""
+import numpy as np
+
+from floodfill import EMPTY_REGION, region_from_mask
+
+DIRECTIONS = ('north', 'south', 'east', 'west')
+
+
+def grow_window(seed, shape, max_distance=None, reach=None, bounds=None):
+    """
+    The (x0, y0, x1, y1) window growth from `seed` can reach, ends exclusive.
+
+    `reach` maps a direction to how far past the seed's own extent growth may
+    go that way (e.g. {'south': 40}); `bounds` clips to an absolute window.
+    """
+    h, w = shape[:2]
+    sx0, sy0, sx1, sy1 = seed.bbox
+    x0, y0, x1, y1 = 0, 0, w, h
+    if max_distance is not None:
+        x0, y0 = max(x0, sx0 - max_distance), max(y0, sy0 - max_distance)
+        x1, y1 = min(x1, sx1 + max_distance), min(y1, sy1 + max_distance)
+    reach = reach or {}
+    unknown = set(reach) - set(DIRECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown reach direction(s) {sorted(unknown)}; expected {DIRECTIONS}")
+    if 'north' in reach:
+        y0 = max(y0, sy0 - reach['north'])
+    if 'south' in reach:
+        y1 = min(y1, sy1 + reach['south'])
+    if 'west' in reach:
+        x0 = max(x0, sx0 - reach['west'])
+    if 'east' in reach:
+        x1 = min(x1, sx1 + reach['east'])
+    if bounds is not None:
+        bx0, by0, bx1, by1 = bounds
+        x0, y0, x1, y1 = max(x0, bx0), max(y0, by0), min(x1, bx1), min(y1, by1)
+    return x0, y0, x1, y1
+
+
+def geodesic_grow(seed, allowed, max_distance=None):
+    """
+    Pixels of `allowed` within 4-connected distance `max_distance` of `seed`.
+
+    Both are boolean masks of the same shape; the path may only pass through
+    allowed pixels. Seed pixels are never part of the result.
+    """
+    reached = seed.copy()
+    added = np.zeros_like(seed)
+    h, w = seed.shape
+    # The frontier is kept as a crop plus its offset, so a step never touches
+    # more than the frontier's bbox (one pixel wider on each side)
+    frontier, fy, fx = seed, 0, 0
+    step = 0
+    while max_distance is None or step < max_distance:
+        rows = np.flatnonzero(frontier.any(axis=1))
+        if not len(rows):
+            break
+        cols = np.flatnonzero(frontier.any(axis=0))
+        y0, y1 = max(0, fy + rows[0] - 1), min(h, fy + rows[-1] + 2)
+        x0, x1 = max(0, fx + cols[0] - 1), min(w, fx + cols[-1] + 2)
+        crop = frontier[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+        oy, ox = fy + rows[0] - y0 + 1, fx + cols[0] - x0 + 1
+        f = np.zeros((y1 - y0 + 2, x1 - x0 + 2), dtype=bool)
+        f[oy:oy + crop.shape[0], ox:ox + crop.shape[1]] = crop
+        grown = f[:-2, 1:-1] | f[2:, 1:-1] | f[1:-1, :-2] | f[1:-1, 2:]
+        new = grown & allowed[y0:y1, x0:x1] & ~reached[y0:y1, x0:x1]
+        reached[y0:y1, x0:x1] |= new
+        added[y0:y1, x0:x1] |= new
+        frontier, fy, fx = new, y0, x0
+        step += 1
+    return added
+
+
+def grow_region(pixels, seed, match, max_distance=None, reach=None, bounds=None):
+    """
+    Grow `seed` (a floodfill.Region) into neighbouring pixels accepted by `match`.
+
+    `match` is a pixel predicate as in floodfill (window -> boolean mask) and is
+    only evaluated on the reachable window. Returns the added pixels as a
+    Region in full-image coordinates; the seed itself is not included.
+    """
+    if not seed.mask.size:
+        return EMPTY_REGION
+    x0, y0, x1, y1 = grow_window(seed, pixels.shape, max_distance, reach, bounds)
+    if x0 >= x1 or y0 >= y1:
+        return EMPTY_REGION
+    seed_mask = np.zeros((y1 - y0, x1 - x0), dtype=bool)
+    sx0, sy0, sx1, sy1 = seed.bbox
+    cx0, cy0, cx1, cy1 = max(sx0, x0), max(sy0, y0), min(sx1, x1), min(sy1, y1)
+    if cx0 < cx1 and cy0 < cy1:
+        seed_mask[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0] = \
+            seed.mask[cy0 - sy0:cy1 - sy0, cx0 - sx0:cx1 - sx0]
+    allowed = match(pixels[y0:y1, x0:x1])
+    return region_from_mask(geodesic_grow(seed_mask, allowed, max_distance), origin=(x0, y0))
@@ -0,0 +1,267 @@
+"""
+Check a file of invariants against the maps, e.g. after running an edit plan.
+
+The verify_* scripts each hard-coded a window and counted pixels by hand.
+A check file states the same facts as data. Every image is classified once
+per tolerance with the palette lookup table (palette.py); each check then
+works on boolean class masks and their connected components
+(floodfill.label_regions), never on single pixels.
+
+Check file (JSON, or YAML when PyYAML is installed):
+
+    {
+      "root": "../..",                  # relative paths start here (default: the file's folder)
+      "images": {"princely": "public/maps/princely-states.png"},
+      "colors": {"hyderabad": [255, 202, 92]},      # extra classes besides palette.MAP_COLORS
+      "checks": [
+        {"name": "No peach left in Ramnad", "assert": "absent", "image": "princely",
+         "classes": ["peach", "peach_border"], "within": ["ramnad*"]},
+        {"name": "Tanjore is one piece", "assert": "connected", "classes": ["tanjore*"],
+         "min_area": 50},
+        {"name": "Ramnad stripes only inside Ramnad", "assert": "inside",
+         "classes": ["ramnad_stripe"], "of": ["ramnad", "ramnad_boundary"]},
+        {"name": "Arcot is drawn", "assert": "present", "classes": ["arcot"], "min_pixels": 10000}
+      ]
+    }
+
+Assertions:
+    absent      no pixel of `classes`
+    present     at least `min_pixels` (default 1) pixels of `classes`
+    connected   at most `max_components` (default 1) components of `classes`
+                with `min_area` pixels or more (default 1); smaller specks are ignored
+    inside      every component of `classes` joined with `of` holds at least one
+                pixel of `of`, i.e. no `classes` pixels stand apart from them
+
+Every check may give "bounds" = [x0, y0, x1, y1] and/or "within" = class
+names whose bbox it is limited to, a "tolerance" (default 9), and "image"
+(default: the first image). Class names take a trailing '*' as in
+palette.Palette.ids(). Failures list the bboxes of the largest offending
+components.
+
+Usage:
+    python mapcheck.py plans/annexed-districts.checks.json
+
+    from mapcheck import ClassMaps, run_check
+    result = run_check(ClassMaps({'princely': pixels}),
+                       {'assert': 'absent', 'classes': ['peach'], 'bounds': [3540, 5920, 3620, 6070]})
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from floodfill import label_regions
+from mapio import cached_image
+from palette import MAP_COLORS, Palette
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+DEFAULT_TOLERANCE = 9
+MAX_BOXES = 5       # offending component bboxes listed per failed check
+
+
+class CheckResult(NamedTuple):
+    name: str
+    passed: bool
+    detail: str
+    boxes: list         # (x0, y0, x1, y1, area) of the largest offending components
+    seconds: float
+
+
+# --- Class masks ---
+class ClassMaps:
+    """Images classified once per tolerance, handing out windowed class masks."""
+
+    def __init__(self, images, colors=None):
+        self.images = images
+        self.colors = dict(MAP_COLORS, **{name: tuple(c) for name, c in (colors or {}).items()})
+        self._palettes = {}
+        self._classified = {}
+
+    def palette(self, tolerance):
+        if tolerance not in self._palettes:
+            self._palettes[tolerance] = Palette([(name, color, tolerance)
+                                                 for name, color in self.colors.items()])
+        return self._palettes[tolerance]
+
+    def classified(self, image, tolerance):
+        key = (image, tolerance)
+        if key not in self._classified:
+            self._classified[key] = self.palette(tolerance).classify(self.images[image])
+        return self._classified[key]
+
+    def mask(self, image, tolerance, names, window=None):
+        """Boolean mask of the named classes over window = (x0, y0, x1, y1), default all."""
+        ids = self.classified(image, tolerance)
+        if window is not None:
+            x0, y0, x1, y1 = window
+            ids = ids[y0:y1, x0:x1]
+        return self.palette(tolerance).select(ids, *names)
+
+
+def _bbox_of(mask):
+    rows = np.flatnonzero(mask.any(axis=1))
+    if not len(rows):
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+def check_window(maps, check):
+    """(image, tolerance, (x0, y0, x1, y1)) a check looks at; None window if `within` is absent."""
+    image = check.get('image') or next(iter(maps.images))
+    tolerance = check.get('tolerance', DEFAULT_TOLERANCE)
+    h, w = maps.images[image].shape[:2]
+    x0, y0, x1, y1 = check.get('bounds') or (0, 0, w, h)
+    window = (max(0, x0), max(0, y0), min(w, x1), min(h, y1))
+    if check.get('within'):
+        box = _bbox_of(maps.mask(image, tolerance, check['within'], window))
+        if box is None:
+            return image, tolerance, None
+        window = (window[0] + box[0], window[1] + box[1], window[0] + box[2], window[1] + box[3])
+    return image, tolerance, window
+
+
+def _components(mask, origin, keep=None):
+    """(count, [(x0, y0, x1, y1, area)] largest first) of the components, optionally filtered."""
+    box = _bbox_of(mask)
+    if box is None:
+        return 0, []
+    # Label only the part of the window the mask covers
+    _, stats = label_regions(mask[box[1]:box[3], box[0]:box[2]])
+    chosen = np.ones(len(stats.area), dtype=bool) if keep is None else keep(stats)
+    order = np.flatnonzero(chosen)[np.argsort(-stats.area[chosen], kind='stable')]
+    ox, oy = origin[0] + box[0], origin[1] + box[1]
+    boxes = [(int(stats.bbox[i, 0]) + ox, int(stats.bbox[i, 1]) + oy,
+              int(stats.bbox[i, 2]) + ox, int(stats.bbox[i, 3]) + oy, int(stats.area[i]))
+             for i in order[:MAX_BOXES]]
+    return len(order), boxes
+
+
+# --- Assertions: check(maps, check) -> (passed, detail, boxes) ---
+def check_absent(maps, check):
+    image, tolerance, window = check_window(maps, check)
+    if window is None:
+        return True, f"no {check['within']} pixels to look within", []
+    mask = maps.mask(image, tolerance, check['classes'], window)
+    found = int(np.count_nonzero(mask))
+    if not found:
+        return True, f"0 px in {window}", []
+    count, boxes = _components(mask, window[:2])
+    return False, f"{found} px in {count} component(s) in {window}", boxes
+
+
+def check_present(maps, check):
+    image, tolerance, window = check_window(maps, check)
+    found = 0 if window is None else int(np.count_nonzero(maps.mask(image, tolerance, check['classes'], window)))
+    wanted = check.get('min_pixels', 1)
+    return found >= wanted, f"{found} px (need {wanted})", []
+
+
+def check_connected(maps, check):
+    image, tolerance, window = check_window(maps, check)
+    if window is None:
+        return False, "nothing to check", []
+    min_area = check.get('min_area', 1)
+    count, boxes = _components(maps.mask(image, tolerance, check['classes'], window), window[:2],
+                               keep=lambda stats: stats.area >= min_area)
+    allowed = check.get('max_components', 1)
+    detail = f"{count} component(s) of {min_area}+ px (allowed {allowed})"
+    return 0 < count <= allowed, detail, [] if 0 < count <= allowed else boxes
+
+
+def check_inside(maps, check):
+    image, tolerance, window = check_window(maps, check)
+    if window is None:
+        return True, "nothing to check", []
+    own = maps.mask(image, tolerance, check['classes'], window)
+    box = _bbox_of(own)
+    if box is None:
+        return True, f"no {check['classes']} pixels", []
+    of = maps.mask(image, tolerance, check['of'], window)
+    # Everything joined to the class pixels lies within the bbox of the union
+    x0, y0, x1, y1 = _bbox_of(own | of)
+    own, of = own[y0:y1, x0:x1], of[y0:y1, x0:x1]
+    window = (window[0] + x0, window[1] + y0, window[0] + x1, window[1] + y1)
+    labels, stats = label_regions(own | of)
+    # Components without a single `of` pixel are strays
+    anchored = np.bincount(labels[of], minlength=len(stats.area) + 1)[1:] > 0
+    stray = np.zeros(len(stats.area) + 1, dtype=bool)
+    stray[1:] = ~anchored
+    strays = stray[labels] & own
+    found = int(np.count_nonzero(strays))
+    if not found:
+        return True, f"{int(np.count_nonzero(own))} px, all joined to {check['of']}", []
+    count, boxes = _components(strays, window[:2])
+    return False, f"{found} px in {count} component(s) apart from {check['of']}", boxes
+
+
+CHECKS = {
+    'absent': check_absent,
+    'present': check_present,
+    'connected': check_connected,
+    'inside': check_inside,
+}
+
+
+# --- Runner ---
+def run_check(maps, check):
+    started = time.time()
+    passed, detail, boxes = CHECKS[check['assert']](maps, check)
+    name = check.get('name') or f"{check['assert']} {check['classes']}"
+    return CheckResult(name, passed, detail, boxes, time.time() - started)
+
+
+def load_checks(path):
+    """Read a JSON or YAML check file; relative paths resolve against its "root"."""
+    with open(path) as f:
+        if path.endswith(('.yaml', '.yml')):
+            if yaml is None:
+                raise ImportError("YAML check files need PyYAML (pip install pyyaml); JSON ones do not")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    spec['root'] = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(path)),
+                                                 spec.get('root', '.')))
+    return spec
+
+
+def run_checks(spec):
+    """Run every check in a loaded check file and print the report; returns the CheckResults."""
+    for i, check in enumerate(spec['checks'], 1):
+        if check.get('assert') not in CHECKS:
+            raise ValueError(f"Check {i}: unknown assert {check.get('assert')!r}; "
+                             f"expected one of {sorted(CHECKS)}")
+
+    started = time.time()
+    images = {name: cached_image(os.path.join(spec['root'], path)) for name, path in spec['images'].items()}
+    maps = ClassMaps(images, spec.get('colors'))
+    print(f"Loaded {', '.join(images)} in {time.time() - started:.1f}s")
+
+    results = []
+    for check in spec['checks']:
+        result = run_check(maps, check)
+        results.append(result)
+        print(f"  {'PASS' if result.passed else 'FAIL'}  {result.name}: {result.detail} "
+              f"({result.seconds * 1000:.0f} ms)")
+        for x0, y0, x1, y1, area in result.boxes:
+            print(f"          ({x0}, {y0}, {x1}, {y1}): {area} px")
+
+    failed = sum(not r.passed for r in results)
+    print(f"{len(results) - failed} passed, {failed} failed in {time.time() - started:.1f}s")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check map invariants.")
+    parser.add_argument('checks', help="JSON (or YAML) check file")
+    args = parser.parse_args()
+    results = run_checks(load_checks(args.checks))
+    sys.exit(0 if all(r.passed for r in results) else 1)
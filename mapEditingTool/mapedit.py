@@ -0,0 +1,324 @@
+"""
+Run a plan of map edits with one decode per source and one encode per output.
+
+The extract/fill/extend scripts each decode princely-states.png, apply one
+edit and re-encode the whole map. A plan lists the same edits as data; every
+image it names is decoded once, every step runs on the in-memory arrays, and
+each output is written once at the end.
+
+Plan (JSON, or YAML when PyYAML is installed):
+
+    {
+      "root": "../..",                  # relative paths start here (default: the plan's folder)
+      "images": {"madras": "mapEditingTool/The-Madras-....png",
+                 "princely": "public/maps/princely-states.png"},
+      "styles": {"arcot": {"fill": [0, 190, 180], "stripe": [0, 140, 130],
+                           "border": [0, 100, 95]}},
+      "steps": [
+        {"op": "extract_districts", "source": "madras", "target": "princely",
+         "offset": [2576, 3694], "scale": 3.2,
+         "districts": [{"name": "Arcot", "seeds": [[330, 534], [318, 573]], "style": "arcot"}]},
+        {"op": "fill_pocket", "target": "princely", "seed": [3700, 5700],
+         "color": [255, 200, 180], "tolerance": 10, "bounds": [3600, 5550, 3800, 5850],
+         "style": "arcot"},
+        {"op": "recolor", "target": ["princely", "presidencies"], "classes": ["peach", "peach_border"],
+         "tolerance": 5, "bounds": [3540, 5920, 3620, 6070], "style": "ramnad_fine"},
+        {"op": "extend", "target": "princely", "from": ["ramnad*"], "into": ["peach", "peach_border"],
+         "max_distance": 30, "reach": {"south": 40}, "bounds": [3200, 5880, 3650, 6180],
+         "style": "ramnad_fine"}
+      ],
+      "outputs": {"princely": "public/maps/princely-states.png"},
+      "tiles": {"princely": "public/tiles/princely-states"}
+    }
+
+Every op reports the box it modified. An output is only re-encoded when its
+pixels differ from what the file holds, and the optional tile pyramids are
+only refreshed under the modified boxes. A step's "target" may be one image
+name or a list. Styles are HatchStyle fields; a step may also give its style
+inline as a dict.
+
+An output may also be {"path": ..., "profile": "preview" | "production"}
+(see mapio.PROFILES); by default files under public/ get the production
+encode and everything else the fast preview one.
+
+Canonical region rasters (regionmap.py): an image given as
+{"regions": "Backup/princely-states.regions.npz"} is rendered from that id
+raster, and the "recolor_state" op recolors a state by changing its table
+rows rather than matching pixels:
+
+    {"op": "recolor_state", "target": "princely", "state": "Mysore", "color": [120, 80, 200]}
+
+An output with "regions" re-encodes the edited image into the raster with
+the same table (so ids stay put), saves it, and writes "path", if given, as
+the PNG rendered from it.
+
+Usage:
+    python mapedit.py plans/annexed-districts.json
+    python mapedit.py plans/render-princely-states.json      # PNG from the canonical raster
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from floodfill import fill_region_holes, flood_fill_color, flood_fill_gray, merge_regions, region_from_mask
+from grow import grow_region
+from hatching import HatchStyle, paint_hatched, render_districts
+from mapio import content_hash, load_image, profile_for, save_if_changed, union_bbox
+from palette import map_palette
+from regionmap import ALL_KINDS, RegionMap, state_table
+from tiles import build_pyramid
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+# --- Plan loading ---
+def load_plan(path):
+    """Read a JSON or YAML plan; relative paths resolve against its "root"."""
+    with open(path) as f:
+        if path.endswith(('.yaml', '.yml')):
+            if yaml is None:
+                raise ImportError("YAML plans need PyYAML (pip install pyyaml); JSON plans do not")
+            plan = yaml.safe_load(f)
+        else:
+            plan = json.load(f)
+    plan['root'] = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(path)),
+                                                 plan.get('root', '.')))
+    return plan
+
+
+def make_style(spec, styles):
+    """A HatchStyle from a style name in the plan or an inline dict of its fields."""
+    if isinstance(spec, str):
+        if spec not in styles:
+            raise KeyError(f"Unknown style {spec!r}; plan defines {sorted(styles)}")
+        spec = styles[spec]
+    fields = dict(spec)
+    for key in ('fill', 'stripe', 'border'):
+        if fields.get(key) is not None:
+            fields[key] = tuple(fields[key])
+    return HatchStyle(**fields)
+
+
+def _targets(step):
+    target = step['target']
+    return [target] if isinstance(target, str) else list(target)
+
+
+def _bounds(step):
+    bounds = step.get('bounds')
+    return tuple(bounds) if bounds is not None else None
+
+
+# --- Operations: op(images, step, styles, regions) edits images[target] in
+# place and returns {target: (x0, y0, x1, y1) it modified, or None}; regions
+# holds the RegionMap of every image loaded from a region raster ---
+def op_extract_districts(images, step, styles, regions):
+    """Flood-fill districts from seeds on a source map and draw them, hatched, onto the target."""
+    source = images[step['source']]
+    districts = []
+    for spec in step['districts']:
+        parts = []
+        for x, y in spec['seeds']:
+            region, _ = fill_region_holes(flood_fill_gray(source, x, y),
+                                          max_hole_size=spec.get('max_hole_size', 500))
+            parts.append(region)
+        district = merge_regions(parts)
+        print(f"    {spec.get('name', spec['seeds'])}: {district.area} px")
+        districts.append((district, make_style(spec['style'], styles)))
+    return {target: render_districts(images[target], districts, offset=tuple(step['offset']),
+                                     scale=step['scale'], dash=step.get('dash', 4),
+                                     gap=step.get('gap', 3))
+            for target in _targets(step)}
+
+
+def op_fill_pocket(images, step, styles, regions):
+    """Flood-fill a same-colored pocket on the target from a seed and hatch it."""
+    style = make_style(step['style'], styles)
+    x, y = step['seed']
+    dirty = {}
+    for target in _targets(step):
+        pixels = images[target]
+        color = step.get('color') or pixels[y, x]
+        pocket = flood_fill_color(pixels, x, y, color, step.get('tolerance', 15), bounds=_bounds(step))
+        if pocket.area < step.get('min_area', 1):
+            print(f"    {target}: pocket of {pocket.area} px is below min_area, skipped")
+            continue
+        dirty[target] = paint_hatched(pixels, pocket, style)
+        print(f"    {target}: {pocket.area} px")
+    return dirty
+
+
+def op_recolor(images, step, styles, regions):
+    """Hatch every pixel of the given palette classes inside `bounds`."""
+    style = make_style(step['style'], styles)
+    palette = map_palette(step.get('tolerance', 9))
+    dirty = {}
+    for target in _targets(step):
+        pixels = images[target]
+        h, w = pixels.shape[:2]
+        x0, y0, x1, y1 = _bounds(step) or (0, 0, w, h)
+        x1, y1 = min(x1, w), min(y1, h)
+        region = region_from_mask(palette.mask(pixels[y0:y1, x0:x1], *step['classes']), origin=(x0, y0))
+        dirty[target] = paint_hatched(pixels, region, style)
+        print(f"    {target}: {region.area} px")
+    return dirty
+
+
+def op_extend(images, step, styles, regions):
+    """Grow the pixels of one set of classes into neighbouring pixels of another."""
+    style = make_style(step['style'], styles)
+    palette = map_palette(step.get('tolerance', 9))
+    into = step['into']
+    dirty = {}
+    for target in _targets(step):
+        pixels = images[target]
+        h, w = pixels.shape[:2]
+        x0, y0, x1, y1 = _bounds(step) or (0, 0, w, h)
+        x1, y1 = min(x1, w), min(y1, h)
+        seed = region_from_mask(palette.mask(pixels[y0:y1, x0:x1], *step['from']), origin=(x0, y0))
+        if not seed.area:
+            print(f"    {target}: no {step['from']} pixels to extend, skipped")
+            continue
+        added = grow_region(pixels, seed, lambda px: palette.mask(px, *into),
+                            max_distance=step.get('max_distance'), reach=step.get('reach'),
+                            bounds=(x0, y0, x1, y1))
+        dirty[target] = paint_hatched(pixels, added, style)
+        print(f"    {target}: +{added.area} px")
+    return dirty
+
+
+def op_recolor_state(images, step, styles, regions):
+    """Give a state a new fill color in its region table; stripes and boundary follow."""
+    dirty = {}
+    for target in _targets(step):
+        if target not in regions:
+            raise ValueError(f"recolor_state needs {target!r} loaded from a region raster "
+                             f"({{\"regions\": ...}} in images)")
+        # Earlier steps painted pixels; bring the ids up to date with them first
+        region_map = regions[target] = RegionMap.from_rgb(images[target], regions[target].table)
+        before = region_map.table.colors
+        region_map.recolor(step['state'], step['color'])
+        if np.array_equal(before, region_map.table.colors):
+            print(f"    {target}: {step['state']} is already {tuple(step['color'])}")
+            continue
+        wanted = np.zeros(len(region_map.table), dtype=bool)
+        wanted[region_map.table.ids(step['state'], ALL_KINDS)] = True
+        box = region_from_mask(wanted[region_map.ids]).bbox
+        if box[2] <= box[0]:
+            print(f"    {target}: {step['state']} is not drawn")
+            continue
+        x0, y0, x1, y1 = box
+        images[target][y0:y1, x0:x1] = region_map.render(np.s_[y0:y1, x0:x1])
+        dirty[target] = box
+        print(f"    {target}: {step['state']} -> {tuple(step['color'])} in {box}")
+    return dirty
+
+
+OPS = {
+    'extract_districts': op_extract_districts,
+    'fill_pocket': op_fill_pocket,
+    'recolor': op_recolor,
+    'extend': op_extend,
+    'recolor_state': op_recolor_state,
+}
+
+
+# --- Runner ---
+LEDGER = '.mapedit-ledger.json'
+
+
+def _save_regions(name, spec, images, regions, root, changed):
+    """Encode an output into its region raster and save it; the PNG output is then rendered from it."""
+    regions_path = os.path.abspath(os.path.join(root, spec['regions']))
+    if name in regions and not changed and os.path.exists(regions_path):
+        print(f"Unchanged {name}, not re-saving {regions_path}")
+        return []
+    table = regions[name].table if name in regions else state_table(pixels=images[name])
+    region_map = RegionMap.from_rgb(images[name], table)
+    # The raster is canonical: whatever is written as the PNG comes from it
+    images[name] = region_map.render()
+    region_map.save(regions_path)
+    regions[name] = region_map
+    print(f"Saved {name} region raster to {regions_path} ({len(table) - 1} ids)")
+    return [regions_path]
+
+
+def run_plan(plan):
+    """
+    Decode every image once, run the steps in order, write each output once.
+
+    Outputs whose pixels match what the file already holds are not
+    re-encoded, and the tile pyramids listed under "tiles" are only updated
+    inside the rectangles the steps modified. Returns the paths written.
+    """
+    root = plan.get('root', '.')
+    styles = plan.get('styles', {})
+    ledger = os.path.join(root, LEDGER)
+    for i, step in enumerate(plan['steps'], 1):
+        if step.get('op') not in OPS:
+            raise ValueError(f"Step {i}: unknown op {step.get('op')!r}; expected one of {sorted(OPS)}")
+
+    started = time.time()
+    images, loaded_hash, sources, regions = {}, {}, {}, {}
+    for name, spec in plan['images'].items():
+        if isinstance(spec, str):
+            sources[name] = os.path.abspath(os.path.join(root, spec))
+            images[name] = load_image(sources[name])
+        else:
+            sources[name] = os.path.abspath(os.path.join(root, spec['regions']))
+            regions[name] = RegionMap.load(sources[name])
+            images[name] = regions[name].render()
+        loaded_hash[name] = content_hash(images[name])
+        print(f"Loaded {name}: {images[name].shape[1]}x{images[name].shape[0]}")
+
+    dirty = {name: [] for name in images}
+    for i, step in enumerate(plan['steps'], 1):
+        print(f"Step {i}: {step['op']}")
+        for target, bbox in (OPS[step['op']](images, step, styles, regions) or {}).items():
+            if bbox is not None:
+                dirty[target].append(bbox)
+
+    for name, boxes in dirty.items():
+        if boxes:
+            print(f"  {name}: modified {union_bbox(boxes)} in {len(boxes)} edit(s)")
+
+    written = []
+    for name, spec in plan.get('outputs', {}).items():
+        if not isinstance(spec, str) and spec.get('regions'):
+            written += _save_regions(name, spec, images, regions, root, bool(dirty[name]))
+            if not spec.get('path'):
+                continue
+        path = spec if isinstance(spec, str) else spec['path']
+        out_path = os.path.abspath(os.path.join(root, path))
+        profile = (None if isinstance(spec, str) else spec.get('profile')) or profile_for(out_path)
+        in_place = out_path == sources[name]
+        if in_place and not dirty[name]:
+            print(f"Unchanged {name}, not re-encoding {out_path}")
+            continue
+        if save_if_changed(images[name], out_path, loaded_hash[name] if in_place else None, ledger,
+                           profile):
+            written.append(out_path)
+            print(f"Saved {name} to {out_path}")
+        else:
+            print(f"Unchanged {name}, not re-encoding {out_path}")
+
+    # Derived artifacts: only the tiles under the modified rectangles
+    for name, tile_dir in plan.get('tiles', {}).items():
+        stats = build_pyramid(images[name], os.path.join(root, tile_dir), rects=dirty[name])
+        print(f"Tiles for {name}: {stats.written} written, {stats.skipped} unchanged")
+
+    print(f"Done in {time.time() - started:.1f}s")
+    return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Apply a plan of map edits in one pass.")
+    parser.add_argument('plan', help="JSON (or YAML) edit plan")
+    args = parser.parse_args()
+    run_plan(load_plan(args.plan))
@@ -0,0 +1,215 @@
+"""
+Reading and writing the map PNGs without redundant work.
+
+Edits report the (x0, y0, x1, y1) box they touched; union_bbox() merges them.
+save_if_changed() hashes the pixels and skips the multi-second PNG encode when
+they match what the file already holds, either because the image was loaded
+from that path and never changed, or because the ledger (a small JSON file of
+path -> size, mtime, pixel hash) says the file was last written with them.
+
+cached_image() keeps the decoded, composited array as a .npy file keyed by
+source path, size and mtime, and opens it memory-mapped: scan and verify
+scripts that read a few hundred pixels start in milliseconds and only page in
+the rows they touch.
+
+save_image() encodes with a named profile: 'preview' for the test-*.png
+outputs that are looked at once (fast, larger files) and 'production' for the
+public/maps assets (maximum compression, written as an indexed PNG-8 when the
+image has at most 256 colors, which is lossless). Every save prints the
+encode time and the file size.
+
+Usage:
+    from mapio import cached_image, content_hash, load_image, save_if_changed, save_image
+
+    pixels = cached_image(princely_path)        # read-only np.memmap
+
+    pixels = load_image(princely_path)
+    before = content_hash(pixels)
+    ...edit pixels...
+    save_if_changed(pixels, princely_path, before)         # 'production' profile
+
+    save_image(pixels, 'test-overlay.png', 'preview')
+"""
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image
+
+from palette import pack_rgb
+
+
+def load_image(path):
+    """Decode a map as (h, w, 3) uint8, compositing any transparency onto white."""
+    img = Image.open(path)
+    if img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info:
+        img = img.convert('RGBA')
+        white_bg = Image.new('RGBA', img.size, (255, 255, 255, 255))
+        img = Image.alpha_composite(white_bg, img)
+    return np.array(img.convert('RGB'))
+
+
+# --- Decoded image cache ---
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.image-cache')
+
+
+def _cache_key(path):
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    source = hashlib.blake2b(path.encode(), digest_size=6).hexdigest()
+    version = hashlib.blake2b(f'{st.st_size}|{st.st_mtime_ns}'.encode(), digest_size=6).hexdigest()
+    stem = re.sub(r'[^A-Za-z0-9_.-]', '_', os.path.splitext(os.path.basename(path))[0])
+    return f'{stem}.{source}', version
+
+
+def cached_image(path, cache_dir=CACHE_DIR):
+    """
+    load_image(path) as a read-only memory map, decoding only on a cache miss.
+
+    An entry is reused while the source's size and mtime are unchanged; a
+    newer decode of the same source replaces the older one.
+    """
+    prefix, version = _cache_key(path)
+    cache_path = os.path.join(cache_dir, f'{prefix}.{version}.npy')
+    if not os.path.exists(cache_path):
+        os.makedirs(cache_dir, exist_ok=True)
+        pixels = load_image(path)
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, pixels)
+        os.replace(tmp_path, cache_path)
+        for stale in glob.glob(os.path.join(cache_dir, f'{glob.escape(prefix)}.*.npy')):
+            if stale != cache_path:
+                os.remove(stale)
+    return np.load(cache_path, mmap_mode='r')
+
+
+def content_hash(pixels):
+    """Hex digest of an image's shape and pixels."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(pixels.shape).encode())
+    digest.update(np.ascontiguousarray(pixels))
+    return digest.hexdigest()
+
+
+def union_bbox(boxes):
+    """Smallest (x0, y0, x1, y1) covering every box; None entries are ignored."""
+    boxes = [b for b in boxes if b is not None]
+    if not boxes:
+        return None
+    return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+            max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+
+# --- Encoding ---
+class EncodeProfile(NamedTuple):
+    """PNG encoder settings for one kind of output."""
+    compress_level: int     # zlib level, 0-9
+    optimize: bool          # let the encoder search for the smallest output
+    indexed: bool           # write PNG-8 with an exact palette when there are <= 256 colors
+
+
+PROFILES = {
+    'preview': EncodeProfile(compress_level=1, optimize=False, indexed=False),
+    'production': EncodeProfile(compress_level=9, optimize=True, indexed=True),
+}
+
+
+def profile_for(path):
+    """'production' for files under a public/ folder, 'preview' for everything else."""
+    parts = os.path.abspath(path).split(os.sep)
+    return 'production' if 'public' in parts else 'preview'
+
+
+def indexed_image(pixels):
+    """An exact palette ('P' mode) image of (h, w, 3) pixels, or None if they use over 256 colors."""
+    packed = pack_rgb(pixels)
+    colors = np.flatnonzero(np.bincount(packed.ravel(), minlength=1 << 24))
+    if len(colors) > 256:
+        return None
+    lut = np.zeros(1 << 24, dtype=np.uint8)
+    lut[colors] = np.arange(len(colors), dtype=np.uint8)
+    img = Image.fromarray(lut[packed], mode='P')
+    img.putpalette(np.stack([colors >> 16, (colors >> 8) & 255, colors & 255], axis=-1)
+                   .astype(np.uint8).tobytes())
+    return img
+
+
+def save_image(image, path, profile='preview'):
+    """
+    Encode an (h, w, 3) array or PIL image to a PNG at `path` with a named profile.
+
+    Prints and returns (bytes written, seconds taken).
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown encode profile {profile!r}; expected one of {sorted(PROFILES)}")
+    settings = PROFILES[profile]
+    started = time.time()
+    img = image if isinstance(image, Image.Image) else Image.fromarray(np.asarray(image))
+    kind = img.mode
+    if settings.indexed and img.mode == 'RGB':
+        palette_img = indexed_image(np.asarray(img))
+        if palette_img is not None:
+            img, kind = palette_img, f'P, {len(palette_img.getpalette()) // 3} colors'
+    img.save(path, 'PNG', compress_level=settings.compress_level, optimize=settings.optimize)
+    elapsed = time.time() - started
+    size = os.path.getsize(path)
+    print(f"  encoded {os.path.basename(path)} ({profile}, {kind}): "
+          f"{size / 1e6:.2f} MB in {elapsed:.2f}s")
+    return size, elapsed
+
+
+# --- Ledger of what each written file holds ---
+def _stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _read_ledger(ledger):
+    try:
+        with open(ledger) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def ledger_hash(path, ledger):
+    """The pixel hash recorded for `path`, if the file is unchanged since it was recorded."""
+    entry = _read_ledger(ledger).get(os.path.abspath(path)) if ledger else None
+    if entry is None or not os.path.exists(path) or entry['stamp'] != _stamp(path):
+        return None
+    return entry['hash']
+
+
+def record_hash(path, digest, ledger):
+    entries = _read_ledger(ledger)
+    entries[os.path.abspath(path)] = {'stamp': _stamp(path), 'hash': digest}
+    with open(ledger, 'w') as f:
+        json.dump(entries, f, indent=1)
+
+
+def save_if_changed(pixels, path, known_hash=None, ledger=None, profile='production'):
+    """
+    Encode `pixels` to `path` unless the file already holds exactly them.
+
+    `known_hash` is the content_hash() of what `path` holds (typically taken
+    right after loading it); otherwise the ledger is consulted. The file is
+    written with save_image() and the given encode profile. Returns True if
+    the file was written.
+    """
+    digest = content_hash(pixels)
+    on_disk = known_hash if known_hash is not None else ledger_hash(path, ledger)
+    if on_disk == digest and os.path.exists(path):
+        return False
+    save_image(pixels, path, profile)
+    if ledger:
+        record_hash(path, digest, ledger)
+    if os.path.exists(f'{os.path.splitext(path)[0]}.regions.json'):
+        print(f"  {os.path.basename(path)} rewritten; its region sidecar may be stale until "
+              f"export_region_sidecars.py is re-run")
+    return True
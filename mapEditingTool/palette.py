@@ -0,0 +1,130 @@
+"""
+Whole-image color classification for the princely states and presidencies maps.
+
+Each pixel's RGB is packed into one uint32 (0xRRGGBB) and looked up in a 2^24
+entry table, so "is this peach?" is a single array operation over an image or
+any window of it instead of a Python test per pixel. A class matches every
+color within +/- its tolerance on each channel; where classes overlap, the one
+listed first wins. Class id 0 means "none of the classes".
+
+Usage:
+    from palette import map_palette
+
+    palette = map_palette(tolerance=9)
+    classes = palette.classify(pixels[5920:6070, 3540:3620])
+    peach = palette.mask(pixels, 'peach*')          # fill or border
+    ramnad = palette.mask(pixels, 'ramnad*')        # fill, stripe or boundary
+"""
+from functools import lru_cache
+
+import numpy as np
+
+# Colors drawn on the maps by the extract/extend scripts, by class name
+MAP_COLORS = {
+    'white': (255, 255, 255),
+    'peach': (255, 200, 180),           # Madras Presidency fill
+    'peach_border': (200, 120, 100),    # Madras Presidency border
+    'arcot': (0, 190, 180),
+    'arcot_stripe': (0, 140, 130),
+    'arcot_boundary': (0, 100, 95),
+    'madurai': (220, 120, 50),
+    'madurai_stripe': (170, 85, 30),
+    'madurai_boundary': (160, 80, 30),
+    'ramnad': (50, 140, 220),
+    'ramnad_stripe': (30, 100, 170),
+    'ramnad_boundary': (30, 90, 160),
+    'tanjore': (255, 50, 120),
+    'tanjore_stripe': (200, 35, 90),
+    'tanjore_boundary': (155, 25, 65),
+}
+
+
+def pack_rgb(pixels):
+    """Pack the RGB channels of an (..., 3+) uint8 array into uint32 0xRRGGBB."""
+    return ((pixels[..., 0].astype(np.uint32) << 16) |
+            (pixels[..., 1].astype(np.uint32) << 8) |
+            pixels[..., 2].astype(np.uint32))
+
+
+def unpack_rgb(packed):
+    """Inverse of pack_rgb(): (..., 3) uint8."""
+    packed = np.asarray(packed, dtype=np.uint32)
+    return np.stack([(packed >> 16) & 255, (packed >> 8) & 255, packed & 255],
+                    axis=-1).astype(np.uint8)
+
+
+def color_counts(pixels):
+    """
+    (colors, counts) of every distinct color in an (h, w, 3) image or window.
+
+    Colors are packed 0xRRGGBB, ascending. Whole maps are counted with one
+    bincount over the 2^24 packed values; small windows with np.unique.
+    """
+    packed = pack_rgb(pixels).ravel()
+    if packed.size < 1 << 20:
+        colors, counts = np.unique(packed, return_counts=True)
+        return colors, counts
+    counts = np.bincount(packed, minlength=1 << 24)
+    colors = np.flatnonzero(counts)
+    return colors.astype(np.uint32), counts[colors]
+
+
+class Palette:
+    """A set of named color classes with per-class tolerance, backed by a lookup table."""
+
+    def __init__(self, classes):
+        """`classes` is a list of (name, (r, g, b), tolerance); ids follow list order from 1."""
+        if len(classes) > 65535:
+            raise ValueError("A palette holds at most 65535 classes")
+        self.names = [name for name, _, _ in classes]
+        self.colors = [tuple(color) for _, color, _ in classes]
+        self.tolerances = [tol for _, _, tol in classes]
+        self._ids = {name: i for i, name in enumerate(self.names, 1)}
+        dtype = np.uint8 if len(classes) < 256 else np.uint16
+        lut = np.zeros((256, 256, 256), dtype=dtype)
+        # Paint tolerance cubes last-to-first so earlier classes win overlaps
+        for class_id in range(len(classes), 0, -1):
+            (r, g, b), tol = self.colors[class_id - 1], self.tolerances[class_id - 1]
+            lut[max(0, r - tol):r + tol + 1,
+                max(0, g - tol):g + tol + 1,
+                max(0, b - tol):b + tol + 1] = class_id
+        self.lut = lut.reshape(-1)
+
+    def __len__(self):
+        return len(self.names)
+
+    def id_of(self, name):
+        return self._ids[name]
+
+    def ids(self, *names):
+        """Class ids for names; a trailing '*' matches every class with that prefix."""
+        out = []
+        for name in names:
+            if name.endswith('*'):
+                matched = [i for n, i in self._ids.items() if n.startswith(name[:-1])]
+                if not matched:
+                    raise KeyError(name)
+                out.extend(matched)
+            else:
+                out.append(self._ids[name])
+        return out
+
+    def classify(self, pixels):
+        """Class id of every pixel of an (h, w, 3) image or window."""
+        return self.lut[pack_rgb(pixels)]
+
+    def mask(self, pixels, *names):
+        """Boolean mask of pixels belonging to any of the named classes."""
+        return self.select(self.classify(pixels), *names)
+
+    def select(self, class_ids, *names):
+        """Boolean mask over an already classified array."""
+        wanted = np.zeros(len(self) + 1, dtype=bool)
+        wanted[self.ids(*names)] = True
+        return wanted[class_ids]
+
+
+@lru_cache(maxsize=None)
+def map_palette(tolerance=9):
+    """Palette of MAP_COLORS, every class matching within `tolerance` per channel."""
+    return Palette([(name, color, tolerance) for name, color in MAP_COLORS.items()])
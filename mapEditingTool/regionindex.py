@@ -0,0 +1,257 @@
+"""
+Spatial index of a map's regions: which region is at a pixel, which regions
+lie in a rectangle, which are the largest there.
+
+The scan scripts found regions by sampling a grid of points and flood
+filling from each one (scan_south_regions.py, find_peach_region.py). Here
+every 4-connected area of one exact color is labeled once
+(floodfill.label_equal_runs), and the index keeps:
+
+- the color runs of every row with their region, so "region at (x, y)" is
+  one binary search within the row;
+- a table of each region's color, area, bbox and seed pixel;
+- a grid of CELL x CELL cells listing the regions whose bbox meets each cell,
+  so a rectangle query only looks at the regions near it.
+
+The index is saved in mapio.CACHE_DIR with the hash of the map file it was
+built from, and rebuilt when the file's contents change. Labeling a full map
+takes a few seconds; loading the saved index takes milliseconds and a query
+microseconds.
+
+Usage:
+    from regionindex import load_index
+
+    index = load_index(princely_path)
+    region = index.region(index.region_at(3700, 5700))  # RegionInfo: id, color, area, bbox, seed
+    ids = index.intersecting((2500, 5800, 4000, 6581))  # bbox overlap; exact=True checks pixels
+    for region_id, area in index.largest((2500, 5800, 4000, 6581), k=10):
+        ...
+    pocket = index.mask(region_id)                      # floodfill.Region
+    peach = index.select(map_palette(), 'peach')        # ids of the regions in palette classes
+    labels = index.labels()                             # (h, w) region ids
+
+    python regionindex.py ../public/maps/princely-states.png 2500 5800 4000 6581
+"""
+import argparse
+import hashlib
+import os
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from floodfill import label_equal_runs, runs_to_mask
+from mapio import CACHE_DIR, cached_image
+from palette import pack_rgb, unpack_rgb
+
+CELL = 128          # grid cell size in pixels
+FORMAT = 1          # bumped when the saved layout changes
+
+
+class RegionInfo(NamedTuple):
+    id: int
+    color: tuple        # (r, g, b)
+    area: int
+    bbox: tuple         # (x0, y0, x1, y1), ends exclusive
+    seed: tuple         # (x, y) of the region's first pixel in raster order
+
+
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RegionIndex(NamedTuple):
+    """Color runs, region table and bbox grid of one map."""
+    shape: tuple                # (h, w)
+    digest: str                 # file_hash() of the map it was built from
+    row_offsets: np.ndarray     # (h + 1,) first run of each row
+    starts: np.ndarray          # (runs,) int32, raster order
+    ends: np.ndarray            # (runs,) int32, exclusive
+    run_region: np.ndarray      # (runs,) int32 region id of each run
+    colors: np.ndarray          # (n,) uint32 packed 0xRRGGBB
+    areas: np.ndarray           # (n,) int64
+    bboxes: np.ndarray          # (n, 4) int32 x0, y0, x1, y1
+    seeds: np.ndarray           # (n, 2) int32 x, y
+    cell_offsets: np.ndarray    # (cells + 1,) first entry of each grid cell, row-major
+    cell_regions: np.ndarray    # region ids of each cell, ascending
+
+    def __len__(self):
+        return len(self.areas)
+
+    @property
+    def grid_shape(self):
+        """(rows, cols) of grid cells."""
+        return -(-self.shape[0] // CELL), -(-self.shape[1] // CELL)
+
+    def region(self, region_id):
+        return RegionInfo(int(region_id), tuple(int(c) for c in unpack_rgb(self.colors[region_id])),
+                          int(self.areas[region_id]), tuple(int(v) for v in self.bboxes[region_id]),
+                          tuple(int(v) for v in self.seeds[region_id]))
+
+    # --- Queries ---
+    def region_at(self, x, y):
+        """Id of the region holding pixel (x, y), or -1 outside the map."""
+        h, w = self.shape
+        if not (0 <= x < w and 0 <= y < h):
+            return -1
+        lo, hi = self.row_offsets[y], self.row_offsets[y + 1]
+        return int(self.run_region[lo + np.searchsorted(self.starts[lo:hi], x, side='right') - 1])
+
+    def _clip(self, rect):
+        h, w = self.shape
+        x0, y0, x1, y1 = rect
+        return max(0, x0), max(0, y0), min(w, x1), min(h, y1)
+
+    def _window_runs(self, rect):
+        """(run indices, clipped lengths) of the runs overlapping rect."""
+        x0, y0, x1, y1 = rect
+        lo, hi = self.row_offsets[y0], self.row_offsets[y1]
+        starts, ends = self.starts[lo:hi], self.ends[lo:hi]
+        hit = np.flatnonzero((starts < x1) & (ends > x0))
+        lengths = np.minimum(ends[hit], x1) - np.maximum(starts[hit], x0)
+        return hit + lo, lengths
+
+    def intersecting(self, rect, exact=False):
+        """
+        Ids of the regions meeting rect = (x0, y0, x1, y1), ascending.
+
+        By default a region counts when its bbox overlaps rect; exact=True
+        keeps only regions with a pixel inside it.
+        """
+        x0, y0, x1, y1 = self._clip(rect)
+        if x0 >= x1 or y0 >= y1:
+            return np.zeros(0, dtype=np.int32)
+        if exact:
+            runs, _ = self._window_runs((x0, y0, x1, y1))
+            return np.unique(self.run_region[runs])
+        _, cols = self.grid_shape
+        cells = [self.cell_regions[self.cell_offsets[cy * cols + x0 // CELL]:
+                                   self.cell_offsets[cy * cols + (x1 - 1) // CELL + 1]]
+                 for cy in range(y0 // CELL, (y1 - 1) // CELL + 1)]
+        ids = np.unique(np.concatenate(cells))
+        b = self.bboxes[ids]
+        return ids[(b[:, 0] < x1) & (b[:, 2] > x0) & (b[:, 1] < y1) & (b[:, 3] > y0)]
+
+    def largest(self, rect, k=10, clipped=False):
+        """
+        [(id, area)] of the k largest regions with a pixel in rect, largest first.
+
+        Areas are whole-region areas, or with clipped=True the pixels each
+        region has inside rect.
+        """
+        x0, y0, x1, y1 = self._clip(rect)
+        if x0 >= x1 or y0 >= y1:
+            return []
+        runs, lengths = self._window_runs((x0, y0, x1, y1))
+        ids, inverse = np.unique(self.run_region[runs], return_inverse=True)
+        if clipped:
+            areas = np.bincount(inverse, weights=lengths, minlength=len(ids)).astype(np.int64)
+        else:
+            areas = self.areas[ids]
+        order = np.argsort(-areas, kind='stable')[:k]
+        return [(int(ids[i]), int(areas[i])) for i in order]
+
+    def select(self, palette, *names):
+        """Ids of the regions whose color falls in the named palette classes."""
+        return np.flatnonzero(palette.select(palette.classify(unpack_rgb(self.colors)), *names))
+
+    def labels(self):
+        """(h, w) int32 raster of region ids."""
+        # The runs tile the map in raster order
+        return np.repeat(self.run_region, self.ends - self.starts).reshape(self.shape)
+
+    def mask(self, region_id):
+        """The region's pixels as a floodfill.Region."""
+        x0, y0, x1, y1 = self.bboxes[region_id]
+        lo, hi = self.row_offsets[y0], self.row_offsets[y1]
+        runs = np.flatnonzero(self.run_region[lo:hi] == region_id) + lo
+        rows = np.searchsorted(self.row_offsets, runs, side='right') - 1
+        return runs_to_mask(rows, self.starts[runs], self.ends[runs])
+
+
+# --- Building ---
+def _region_grid(bboxes, grid_shape):
+    """(cell_offsets, cell_regions): every region listed in each cell its bbox meets."""
+    rows, cols = grid_shape
+    cx0, cy0 = bboxes[:, 0] // CELL, bboxes[:, 1] // CELL
+    cx1, cy1 = (bboxes[:, 2] - 1) // CELL, (bboxes[:, 3] - 1) // CELL
+    span = cx1 - cx0 + 1
+    counts = span * (cy1 - cy0 + 1)
+    region = np.repeat(np.arange(len(bboxes), dtype=np.int32), counts)
+    # k-th cell of a region's bbox, walked row by row
+    k = np.arange(len(region)) - np.repeat(np.cumsum(counts) - counts, counts)
+    cell = (np.repeat(cy0, counts) + k // np.repeat(span, counts)) * cols \
+        + np.repeat(cx0, counts) + k % np.repeat(span, counts)
+    order = np.argsort(cell, kind='stable')
+    offsets = np.searchsorted(cell[order], np.arange(rows * cols + 1))
+    return offsets, region[order]
+
+
+def build_index(pixels, digest=''):
+    """RegionIndex of every one-color region of an (h, w, 3) map."""
+    h, w = pixels.shape[:2]
+    packed = pack_rgb(pixels)
+    rows, starts, ends, run_region = label_equal_runs(packed)
+    n = int(run_region.max()) + 1
+
+    areas = np.bincount(run_region, weights=ends - starts, minlength=n).astype(np.int64)
+    _, first = np.unique(run_region, return_index=True)     # each region's first run: its seed
+    bboxes = np.empty((n, 4), dtype=np.int32)
+    bboxes[:, 0] = w
+    bboxes[:, 1] = rows[first]
+    bboxes[:, 2] = 0
+    bboxes[:, 3] = 0
+    np.minimum.at(bboxes[:, 0], run_region, starts)
+    np.maximum.at(bboxes[:, 2], run_region, ends)
+    np.maximum.at(bboxes[:, 3], run_region, rows + 1)
+    seeds = np.stack([starts[first], rows[first]], axis=1).astype(np.int32)
+
+    cell_offsets, cell_regions = _region_grid(bboxes, (-(-h // CELL), -(-w // CELL)))
+    return RegionIndex((h, w), digest, np.searchsorted(rows, np.arange(h + 1)),
+                       starts.astype(np.int32), ends.astype(np.int32), run_region,
+                       packed[rows[first], starts[first]], areas, bboxes, seeds,
+                       cell_offsets, cell_regions.astype(np.int32))
+
+
+def index_path(image_path, cache_dir=CACHE_DIR):
+    source = hashlib.blake2b(os.path.abspath(image_path).encode(), digest_size=6).hexdigest()
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    return os.path.join(cache_dir, f'{stem}.{source}.index.npz')
+
+
+def load_index(image_path, cache_dir=CACHE_DIR):
+    """build_index() of a map file, saved in the cache until the file's hash changes."""
+    path = index_path(image_path, cache_dir)
+    digest = file_hash(image_path)
+    if os.path.exists(path):
+        with np.load(path) as data:
+            if int(data['format']) == FORMAT and str(data['digest']) == digest:
+                return RegionIndex(tuple(int(v) for v in data['shape']), digest,
+                                   *(data[f] for f in RegionIndex._fields[2:]))
+    index = build_index(cached_image(image_path), digest)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp.npz'
+    np.savez(tmp_path, format=FORMAT, shape=np.array(index.shape), digest=np.array(digest),
+             **{f: getattr(index, f) for f in RegionIndex._fields[2:]})
+    os.replace(tmp_path, path)
+    return index
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="List the largest regions of a map inside a rectangle.")
+    parser.add_argument('image')
+    parser.add_argument('rect', type=int, nargs=4, metavar=('X0', 'Y0', 'X1', 'Y1'))
+    parser.add_argument('-k', type=int, default=10, help="regions to list")
+    parser.add_argument('--clipped', action='store_true', help="rank by pixels inside the rectangle")
+    args = parser.parse_args()
+
+    started = time.time()
+    index = load_index(args.image)
+    print(f"{len(index)} regions in {index.shape[1]}x{index.shape[0]} ({time.time() - started:.2f}s)")
+    for region_id, area in index.largest(args.rect, args.k, args.clipped):
+        region = index.region(region_id)
+        print(f"  {area:>9,} px  #{region_id:<7} RGB{region.color}  bbox {region.bbox}  seed {region.seed}")
@@ -0,0 +1,322 @@
+"""
+Palette-indexed region map: the canonical form of the princely states map.
+
+Instead of recovering "which state is this" by comparing RGB values, the map
+is kept as a uint16 raster of region ids plus a RegionTable giving each id a
+name, a kind (fill, stripe, boundary or other) and a color. The RGB PNG the
+app shows is rendered from it with one table lookup, so recoloring a state is
+a change to one table row rather than a rewrite of every pixel, and edits and
+queries work on integer ids.
+
+The table only holds colors that are really drawn. Every state color from
+Backup/princely-states-map-colors.json gets a row (a fill, unless it is one
+of the hatching colors below, like Arcot's stripe). The extract scripts'
+colors (palette.MAP_COLORS) give the stripe and boundary rows, attached to the
+mapped state whose fill they hatch (Arcot) or to their own class name
+(Madurai, Ramnad, Tanjore). Given the map, state_table() adds every other
+color on it - base map borders, labels, other provinces - as an 'other' row,
+most pixels first, so encode -> render is lossless. Id 0 is never assigned.
+
+build_region_map.py writes the canonical raster to
+Backup/princely-states.regions.npz; a mapedit plan can load it as an image
+and write it back as an output, rendering the PNG from it (see mapedit.py).
+
+Usage:
+    from regionmap import RegionMap, state_table
+
+    region_map = RegionMap.from_rgb(pixels, state_table(pixels=pixels))
+    region_map.save('princely-states.regions.npz')
+
+    region_map = RegionMap.load('princely-states.regions.npz')
+    hyderabad = region_map.mask('Hyderabad')              # fill only
+    travancore = region_map.mask('Travancore', kinds=ALL_KINDS)
+    region_map.recolor('Arcot', (120, 80, 200))           # fill, stripe and boundary
+    Image.fromarray(region_map.render()).save('princely-states.png')
+
+    # princely-states.regions.png + .regions.json for the web highlight
+    export_sidecar(region_map, 'public/maps/princely-states', 'public/maps/princely-states.png')
+"""
+import hashlib
+import json
+import os
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image
+
+from palette import MAP_COLORS, color_counts, pack_rgb
+
+STATE_COLORS_JSON = '/Users/sahanavasanth/Desktop/LavenderCoinApp/Backup/princely-states-map-colors.json'
+
+FILL, STRIPE, BOUNDARY, OTHER = 'fill', 'stripe', 'boundary', 'other'
+ALL_KINDS = (FILL, STRIPE, BOUNDARY)
+
+
+class RegionEntry(NamedTuple):
+    """One row of the table. `states` lists every state drawn in this color."""
+    name: str
+    kind: str
+    color: tuple
+    states: tuple = ()
+
+
+class RegionTable:
+    """Region id -> RegionEntry, with the reverse lookups the map needs."""
+
+    def __init__(self, entries=()):
+        self.entries = [RegionEntry('', OTHER, (0, 0, 0))]   # id 0: unassigned
+        self._ids = {}
+        for entry in entries:
+            self.add(*entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, name, kind, color, states=()):
+        """Append a row and return its id."""
+        if len(self.entries) > 65535:
+            raise ValueError("A region table holds at most 65535 ids")
+        region_id = len(self.entries)
+        self.entries.append(RegionEntry(name, kind, tuple(int(c) for c in color),
+                                        tuple(states) or (name,)))
+        # A state may have several colors of one kind (Arcot's app mapping lists
+        # two fills); id_of() gives the first, ids() gives them all
+        self._ids.setdefault((name, kind), region_id)
+        return region_id
+
+    def id_of(self, name, kind=FILL):
+        return self._ids[(name, kind)]
+
+    def ids(self, name, kinds=(FILL,)):
+        """Ids of a region's rows of the given kinds; matches a region or any state drawn in it."""
+        out = [i for i, e in enumerate(self.entries)
+               if e.kind in kinds and (e.name == name or name in e.states)]
+        if not out:
+            raise KeyError(name)
+        return out
+
+    @property
+    def colors(self):
+        """(n, 3) uint8 color of every id, for rendering."""
+        return np.array([e.color for e in self.entries], dtype=np.uint8)
+
+    def set_color(self, region_id, color):
+        self.entries[region_id] = self.entries[region_id]._replace(color=tuple(int(c) for c in color))
+
+    def to_json(self):
+        return json.dumps([[e.name, e.kind, list(e.color), list(e.states)]
+                           for e in self.entries[1:]])
+
+    @classmethod
+    def from_json(cls, text):
+        return cls((name, kind, tuple(color), tuple(states))
+                   for name, kind, color, states in json.loads(text))
+
+
+def state_table(colors_json=STATE_COLORS_JSON, pixels=None):
+    """
+    Table of every state color in a map-colors JSON plus the MAP_COLORS classes.
+
+    With `pixels`, MAP_COLORS classes absent from the map are left out and
+    every other color of the map is added as an 'other' row.
+    """
+    with open(colors_json) as f:
+        mappings = json.load(f)
+    # States that share a color share one region
+    by_color = {}
+    for m in mappings:
+        color = tuple(int(c) for c in m['color'].split(','))
+        by_color.setdefault(color, []).append(m['state'])
+    # A mapped color that is a MAP_COLORS stripe or boundary keeps that kind
+    variants = {color: {'stripe': STRIPE, 'boundary': BOUNDARY}[name.partition('_')[2]]
+                for name, color in MAP_COLORS.items()
+                if name.partition('_')[2] in ('stripe', 'boundary')}
+    table = RegionTable()
+    for color, states in by_color.items():
+        table.add(states[0], variants.get(color, FILL), color, states)
+
+    present = None
+    if pixels is not None:
+        colors, counts = color_counts(pixels)
+        present = set(colors.tolist())
+    # Colors drawn by the extract scripts: 'arcot_stripe' -> ('arcot', 'stripe'),
+    # hatching the mapped state of the same fill color when there is one
+    for class_name, color in MAP_COLORS.items():
+        if present is not None and int(pack_rgb(np.array(color))) not in present:
+            continue
+        base, _, suffix = class_name.partition('_')
+        kind = {'': FILL, 'stripe': STRIPE, 'boundary': BOUNDARY}.get(suffix, OTHER)
+        if kind == OTHER:
+            table.add(class_name, OTHER, color)
+            continue
+        if tuple(color) in by_color:
+            continue            # already mapped (Arcot's mapping lists its stripe color too)
+        states = by_color.get(MAP_COLORS[base], ())
+        table.add(states[0] if states else base, kind, color, states)
+
+    if pixels is not None:
+        listed = set(pack_rgb(table.colors[1:]).tolist())
+        for value in colors[np.argsort(-counts, kind='stable')].tolist():
+            if value not in listed:
+                color = ((value >> 16) & 255, (value >> 8) & 255, value & 255)
+                table.add('#%02x%02x%02x' % color, OTHER, color)
+    return table
+
+
+class RegionMap:
+    """A uint16 region-id raster and the table that names and colors its ids."""
+
+    def __init__(self, ids, table):
+        self.ids = ids
+        self.table = table
+
+    @property
+    def shape(self):
+        return self.ids.shape
+
+    @classmethod
+    def from_rgb(cls, pixels, table):
+        """
+        Encode an RGB image. Each pixel gets the first table id with its exact
+        color; colors the table lacks are appended as 'other' rows.
+        """
+        packed = pack_rgb(pixels)
+        lut = np.zeros(1 << 24, dtype=np.uint16)
+        table_packed = pack_rgb(table.colors[1:])
+        # Assign last-to-first so the earliest row wins a shared color
+        lut[table_packed[::-1]] = np.arange(len(table) - 1, 0, -1)
+        ids = lut[packed]
+        missing = ids == 0
+        if missing.any():
+            for value in np.unique(packed[missing]).tolist():
+                color = ((value >> 16) & 255, (value >> 8) & 255, value & 255)
+                lut[value] = table.add('#%02x%02x%02x' % color, OTHER, color)
+            ids[missing] = lut[packed[missing]]
+        return cls(ids, table)
+
+    def compact(self):
+        """Copy keeping only the ids that occur in the raster, renumbered from 1 in table order."""
+        used = np.bincount(self.ids.ravel(), minlength=len(self.table)) > 0
+        used[0] = False
+        remap = np.zeros(len(self.table), dtype=np.uint16)
+        table = RegionTable()
+        for region_id in np.flatnonzero(used).tolist():
+            remap[region_id] = table.add(*self.table.entries[region_id])
+        return RegionMap(remap[self.ids], table)
+
+    def bboxes(self):
+        """(n, 4) bbox (x0, y0, x1, y1, ends exclusive) and pixel count of every id; empty ids get zeros."""
+        n = len(self.table)
+        h, w = self.ids.shape
+        in_row = np.zeros((h, n), dtype=bool)
+        in_col = np.zeros((w, n), dtype=bool)
+        counts = np.zeros(n, dtype=np.int64)
+        # Row bands keep the (position, id) histograms small
+        for y0 in range(0, h, 512):
+            band = self.ids[y0:y0 + 512].astype(np.int64)
+            rows = np.arange(y0, y0 + len(band))[:, None] * n + band
+            in_row.ravel()[rows] = True
+            cols = np.arange(w)[None, :] * n + band
+            in_col.ravel()[cols] = True
+            counts += np.bincount(band.ravel(), minlength=n)
+        boxes = np.zeros((n, 4), dtype=np.int64)
+        present = counts > 0
+        boxes[present, 0] = in_col[:, present].argmax(axis=0)
+        boxes[present, 1] = in_row[:, present].argmax(axis=0)
+        boxes[present, 2] = w - in_col[::-1, present].argmax(axis=0)
+        boxes[present, 3] = h - in_row[::-1, present].argmax(axis=0)
+        return boxes, counts
+
+    def render(self, window=np.s_[:, :]):
+        """RGB image (or window of it) drawn from the current table colors."""
+        return self.table.colors[self.ids[window]]
+
+    def mask(self, name, kinds=(FILL,), window=np.s_[:, :]):
+        """Boolean mask of a region's pixels of the given kinds."""
+        wanted = np.zeros(len(self.table), dtype=bool)
+        wanted[self.table.ids(name, kinds)] = True
+        return wanted[self.ids[window]]
+
+    def recolor(self, name, color):
+        """
+        Give a state a new fill color. Its stripe and boundary rows follow,
+        keeping their per-channel ratio to the old fill.
+        """
+        ids = self.table.ids(name, ALL_KINDS)
+        fills = [i for i in ids if self.table.entries[i].kind == FILL]
+        old = np.array(self.table.entries[fills[0]].color if fills else color, dtype=float)
+        for region_id in ids:
+            entry = self.table.entries[region_id]
+            variant = np.array(entry.color, dtype=float)
+            # Channels the old fill lacks take the variant's overall brightness ratio
+            overall = variant.sum() / old.sum() if old.sum() else 1.0
+            ratio = np.divide(variant, old, out=np.full(3, overall), where=old > 0)
+            new = np.minimum(255, np.round(np.array(color) * ratio))
+            self.table.set_color(region_id, new.astype(int) if entry.kind != FILL else color)
+
+    def save(self, path):
+        np.savez_compressed(path, ids=self.ids, table=np.array(self.table.to_json()))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['ids'], RegionTable.from_json(str(data['table'])))
+
+
+# --- Web sidecar ---
+def export_sidecar(region_map, stem, source_path):
+    """
+    Write the compact id raster and JSON index the web app highlights from.
+
+    `region_map` must be the encoding of the PNG at `source_path`. The index
+    records that file's SHA-256, and the app ignores the sidecar once the PNG
+    no longer matches it.
+
+    `stem`.regions.png holds each pixel's id: as a palette PNG (PNG-8) whose
+    entry i is (i, 0, 0) when there are at most 256 ids, else as RGB with the
+    id's low byte in red and high byte in green. Either way a browser reads
+    id = R + 256 * G back from canvas pixels. `stem`.regions.json maps every
+    id to its color, name and bbox, and every state to its ids and bbox.
+    Returns the two paths.
+    """
+    region_map = region_map.compact()
+    ids = region_map.ids
+    n = len(region_map.table)
+    if n <= 256:
+        image = Image.fromarray(ids.astype(np.uint8), mode='P')
+        palette = np.zeros((256, 3), dtype=np.uint8)
+        palette[:, 0] = np.arange(256)
+        image.putpalette(palette.ravel().tolist())
+    else:
+        rgb = np.zeros(ids.shape + (3,), dtype=np.uint8)
+        rgb[..., 0] = ids & 255
+        rgb[..., 1] = ids >> 8
+        image = Image.fromarray(rgb)
+    png_path = f'{stem}.regions.png'
+    image.save(png_path)
+
+    boxes, counts = region_map.bboxes()
+    regions = []
+    states = {}
+    for region_id, entry in enumerate(region_map.table.entries[1:], 1):
+        bbox = boxes[region_id].tolist()
+        regions.append({'id': region_id, 'color': ','.join(map(str, entry.color)),
+                        'name': entry.name, 'kind': entry.kind, 'bbox': bbox,
+                        'pixels': int(counts[region_id])})
+        if entry.kind == OTHER:
+            continue
+        for state in entry.states:
+            slot = states.setdefault(state, {'ids': [], 'bbox': bbox})
+            slot['ids'].append(region_id)
+            x0, y0, x1, y1 = slot['bbox']
+            slot['bbox'] = [min(x0, bbox[0]), min(y0, bbox[1]), max(x1, bbox[2]), max(y1, bbox[3])]
+    h, w = ids.shape
+    with open(source_path, 'rb') as f:
+        source_sha256 = hashlib.sha256(f.read()).hexdigest()
+    index = {'source': os.path.basename(source_path), 'sourceSha256': source_sha256, 'width': w, 'height': h,
+             'encoding': 'png8' if n <= 256 else 'rg16',
+             'regions': regions, 'states': states}
+    index_path = f'{stem}.regions.json'
+    with open(index_path, 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+    return png_path, index_path
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Automatic registration of the Madras Presidency map onto the princely states map.
+
+The OVERLAY_X/Y/SCALE constants the extract scripts carry were dragged into
+place by hand in align-districts.html, and two sessions gave two different
+calibrations. This finds the same three numbers (target = offset + source *
+scale) by matching coastlines:
+
+- Madras: the outer edge of the largest inked component, opened by two
+  pixels so district numbers and grid ticks drop out, with the frame margin
+  cleared.
+- Princely: the edge of the land in princely-states-outline.png, i.e. of
+  everything the white sea fill from the corner does not reach (coastline.py,
+  cached beside the map).
+
+Both edge masks are reduced into pyramids by block max. At the coarsest level
+every candidate scale is scored at every translation at once with an FFT
+cross-correlation of the scaled Madras edge points against the blurred
+outline edges. The best few peaks are then refined level by level: each
+level scores a small grid of scales and translations of the coast's centroid
+around the previous estimate with one vectorized gather, re-centering the
+grid until the estimate stops moving. The residual is the distance from each
+Madras coast point to the nearest outline edge pixel at full resolution.
+The two maps are drawn in different projections, so a single scale leaves a
+median residual of about 12 px at the best fit.
+
+Usage:
+    python registration.py                          # default maps, prints and saves the result
+    python registration.py madras.png outline.png -o madras-registration.json
+
+    from registration import register
+    result = register(madras_pixels, outline_pixels)
+    print(result.offset, result.scale, result.residual)
+"""
+import argparse
+import json
+import time
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from coastline import find_coastline, load_coastline
+from contours import boundary_mask
+from floodfill import fill_holes, label_regions
+from mapio import cached_image
+
+# (outline factor, Madras factor) per pyramid level, coarse to fine. One
+# Madras pixel is about 3.5 outline pixels, so its pyramid runs ~4x finer.
+LEVELS = ((16, 4), (8, 2), (4, 1), (2, 1), (1, 1))
+SCALE_RANGE = (2.8, 4.2)    # outline px per Madras px to search
+SCALE_STEP = 0.02           # coarse scale spacing; about one coarse pixel across Madras
+BLUR_RADIUS = 1.5           # edge tolerance, in pixels of each level
+CANDIDATES = 3              # coarse peaks carried into refinement
+REFINE_STEPS = 4            # refinement grid half-width (in steps) per parameter
+MAX_PASSES = 6              # re-centered refinement grids per level
+OPENING = 2                 # Madras erosion/dilation radius
+FRAME_MARGIN = 15           # Madras border pixels that are frame, not coast
+INLIER_DISTANCE = 3.0       # residual distance counted as on the coast
+
+madras_path = "/Users/sahanavasanth/Desktop/LavenderCoinApp/mapEditingTool/The-Madras-Presidency-with-its-26-districts-1-Anantapur-2-Bellary-3-Chingleput.png"
+outline_path = "/Users/sahanavasanth/Desktop/LavenderCoinApp/mapEditingTool/princely-states-outline.png"
+output_path = "/Users/sahanavasanth/Desktop/LavenderCoinApp/mapEditingTool/madras-registration.json"
+
+# Hand-aligned calibrations the extract scripts carry: (name, x, y, scale)
+MANUAL_CALIBRATIONS = [
+    ('extract_arcot_districts / extract_madurai_ramnad', 2576, 3694, 3.2),
+    ('extract_tanjore / extract_tinnevelly', 2470, 3410, 3.6),
+]
+
+
+class Registration(NamedTuple):
+    """target = offset + source * scale, and how well the coastlines agree under it."""
+    offset: tuple       # (x, y) in outline pixels
+    scale: float
+    residual: float     # mean distance of the Madras coast to the outline coast, px
+    median: float
+    inliers: float      # fraction of coast points within INLIER_DISTANCE
+    seconds: float = 0.0
+
+    def to_json(self):
+        return {
+            'overlay_x': int(round(self.offset[0])),
+            'overlay_y': int(round(self.offset[1])),
+            'overlay_scale': round(self.scale, 3),
+            'residual_px': round(self.residual, 2),
+            'median_px': round(self.median, 2),
+            'inliers': round(self.inliers, 3),
+        }
+
+
+# --- Edge masks ---
+def _erode(mask, radius):
+    for _ in range(radius):
+        p = np.pad(mask, 1, constant_values=True)
+        mask = p[1:-1, 1:-1] & p[:-2, 1:-1] & p[2:, 1:-1] & p[1:-1, :-2] & p[1:-1, 2:]
+    return mask
+
+
+def _dilate(mask, radius):
+    for _ in range(radius):
+        p = np.pad(mask, 1)
+        mask = p[1:-1, 1:-1] | p[:-2, 1:-1] | p[2:, 1:-1] | p[1:-1, :-2] | p[1:-1, 2:]
+    return mask
+
+
+def madras_coast(pixels, ink=245, opening=OPENING, margin=FRAME_MARGIN):
+    """Edge mask of the Madras map's land: the largest inked component, holes filled."""
+    land = _dilate(_erode(pixels[..., :3].min(axis=-1) < ink, opening), opening)
+    labels, stats = label_regions(land)
+    land, _ = fill_holes(labels == int(np.argmax(stats.area)) + 1, max_hole_size=None)
+    edge = boundary_mask(land)
+    edge[:margin] = edge[-margin:] = False
+    edge[:, :margin] = edge[:, -margin:] = False
+    return edge
+
+
+def outline_coast(coast):
+    """Edge mask of the land on the outline map, from its coastline.Coastline."""
+    return boundary_mask(coast.land_mask())
+
+
+def pyramid(mask, factors):
+    """{factor: mask reduced by block max}; a pixel is set if any pixel of its block is.
+
+    Factors are powers of two; each level is reduced from the one below it.
+    """
+    levels = {1: mask}
+    f = 1
+    while f < max(factors):
+        h, w = mask.shape
+        padded = np.zeros((h + h % 2, w + w % 2), dtype=bool)
+        padded[:h, :w] = mask
+        mask = padded[0::2, 0::2] | padded[1::2, 0::2] | padded[0::2, 1::2] | padded[1::2, 1::2]
+        f *= 2
+        levels[f] = mask
+    return {f: levels[f] for f in factors}
+
+
+def _soft(edges, radius=BLUR_RADIUS):
+    """Blurred edges in [0, 1]: the score of a point falls off with its distance to an edge."""
+    image = Image.fromarray(edges.astype(np.uint8) * 255).filter(ImageFilter.GaussianBlur(radius))
+    soft = np.asarray(image, dtype=np.float32)
+    return np.maximum(soft / max(float(soft.max()), 1.0), edges)
+
+
+def _points(mask, factor):
+    """(n, 2) float source coordinates, in full-resolution pixels, of a pyramid level's set pixels."""
+    ys, xs = np.nonzero(mask)
+    return np.stack([xs, ys], axis=-1) * float(factor) + factor / 2
+
+
+# --- Search ---
+def _fft_size(n):
+    """Smallest 2**a * 3**b >= n, which numpy's FFT handles quickly."""
+    return min(2 ** a * 3 ** b for a in range(int(np.log2(n)) + 2) for b in range(3)
+               if 2 ** a * 3 ** b >= n)
+
+
+def _coarse(points, soft, factor, scales):
+    """[(score, (x, y), scale)] of the best translation at each scale, by FFT correlation."""
+    h, w = soft.shape
+    span = points.max(axis=0) - points.min(axis=0)
+    # Pad so no translation wraps around; the template may hang off either side
+    reach = np.ceil(span * max(scales) / factor).astype(int) + 2
+    shape = (_fft_size(h + reach[1]), _fft_size(w + reach[0]))
+    target = np.zeros(shape, dtype=np.float32)
+    target[:h, :w] = soft
+    spectrum = np.fft.rfft2(target)
+    peaks = []
+    for scale in scales:
+        cells = np.floor(points * scale / factor).astype(int)
+        origin = cells.min(axis=0)
+        cells -= origin
+        template = np.zeros(shape, dtype=np.float32)
+        np.add.at(template, (cells[:, 1], cells[:, 0]), 1.0)
+        corr = np.fft.irfft2(spectrum * np.conj(np.fft.rfft2(template)), s=shape)
+        ty, tx = np.unravel_index(int(np.argmax(corr)), shape)
+        # Shifts past the map are negative ones
+        ty, tx = (ty - shape[0] if ty >= h else ty), (tx - shape[1] if tx >= w else tx)
+        offset = ((tx - origin[0]) * factor, (ty - origin[1]) * factor)
+        peaks.append((float(corr[ty, tx]) / len(points), offset, float(scale)))
+    return peaks
+
+
+def _score(points, soft, factor, offsets_x, offsets_y, scales):
+    """Mean soft-edge value under the points for every (scale, y, x) combination."""
+    h, w = soft.shape
+    sx = points[:, 0][None, :] * scales[:, None]            # (scales, n)
+    sy = points[:, 1][None, :] * scales[:, None]
+    gx = np.floor((offsets_x[None, :, None] + sx[:, None, :]) / factor).astype(int)     # (s, x, n)
+    gy = np.floor((offsets_y[None, :, None] + sy[:, None, :]) / factor).astype(int)     # (s, y, n)
+    inside_x, inside_y = (gx >= 0) & (gx < w), (gy >= 0) & (gy < h)
+    gx, gy = np.clip(gx, 0, w - 1), np.clip(gy, 0, h - 1)
+    values = soft[gy[:, :, None, :], gx[:, None, :, :]]     # (s, y, x, n)
+    values *= inside_y[:, :, None, :] & inside_x[:, None, :, :]
+    return values.mean(axis=-1)
+
+
+def _refine(points, edges, factor, center, scale, scale_step):
+    """
+    Best (score, center, scale) on a grid of +-REFINE_STEPS steps around an estimate.
+
+    `points` are relative to their centroid and `center` is where the centroid
+    lands, so a change of scale does not drag the translation with it.
+    """
+    steps = np.arange(-REFINE_STEPS, REFINE_STEPS + 1)
+    scales = scale + steps * scale_step
+    centers_x, centers_y = center[0] + steps * factor / 2, center[1] + steps * factor / 2
+    # Only the part of the level the points can land on is blurred and scored
+    reach = np.abs(points).max(axis=0) * scales[-1]
+    lo = (np.array([centers_x[0], centers_y[0]]) - reach) / factor
+    hi = (np.array([centers_x[-1], centers_y[-1]]) + reach) / factor
+    margin = int(4 * BLUR_RADIUS) + 2
+    x0, y0 = np.maximum(0, np.floor(lo).astype(int) - margin)
+    x1, y1 = np.ceil(hi).astype(int) + margin
+    soft = _soft(edges[y0:y1, x0:x1])
+    scores = _score(points, soft, factor, centers_x - x0 * factor, centers_y - y0 * factor, scales)
+    s, y, x = np.unravel_index(int(np.argmax(scores)), scores.shape)
+    return float(scores[s, y, x]), (float(centers_x[x]), float(centers_y[y])), float(scales[s])
+
+
+def coast_distances(points, edges, offset, scale, chunk=256):
+    """Distance from each transformed point to the nearest set pixel of `edges`."""
+    tx = offset[0] + points[:, 0] * scale
+    ty = offset[1] + points[:, 1] * scale
+    # Edge pixels near the footprint are enough for any point with a near match
+    reach = 64
+    x0, y0 = max(0, int(tx.min()) - reach), max(0, int(ty.min()) - reach)
+    x1, y1 = int(tx.max()) + reach, int(ty.max()) + reach
+    ey, ex = np.nonzero(edges[y0:y1, x0:x1])
+    ex, ey = (ex + x0 + 0.5).astype(np.float32), (ey + y0 + 0.5).astype(np.float32)
+    if not len(ex):
+        return np.full(len(points), np.inf)
+    nearest = np.empty(len(points))
+    for i in range(0, len(points), chunk):
+        d2 = (tx[i:i + chunk, None] - ex[None, :]) ** 2 + (ty[i:i + chunk, None] - ey[None, :]) ** 2
+        nearest[i:i + chunk] = np.sqrt(d2.min(axis=1))
+    return nearest
+
+
+def evaluate(madras_edges, outline_edges, offset, scale):
+    """Registration of a given calibration, e.g. a hand-aligned one."""
+    d = coast_distances(_points(madras_edges, 1), outline_edges, offset, scale)
+    return Registration(tuple(offset), float(scale), float(d.mean()), float(np.median(d)),
+                        float(np.mean(d <= INLIER_DISTANCE)))
+
+
+def register_edges(madras_edges, outline_edges, scale_range=SCALE_RANGE, levels=LEVELS):
+    """Coarse-to-fine search of offset and scale mapping Madras edges onto outline edges."""
+    started = time.time()
+    sources = pyramid(madras_edges, [m for _, m in levels])
+    targets = pyramid(outline_edges, [o for o, _ in levels])
+
+    factor, source = levels[0]
+    points, soft = _points(sources[source], source), _soft(targets[factor])
+    scales = np.arange(scale_range[0], scale_range[1] + SCALE_STEP / 2, SCALE_STEP)
+    peaks = sorted(_coarse(points, soft, factor, scales), reverse=True)
+
+    # Several scales usually share one peak; keep distinct ones
+    candidates = []
+    for score, offset, scale in peaks:
+        if all(np.hypot(offset[0] - o[0], offset[1] - o[1]) > 4 * factor for _, o, _ in candidates):
+            candidates.append((score, offset, scale))
+        if len(candidates) == CANDIDATES:
+            break
+
+    # Refine the position of the coast's centroid rather than of the map's corner
+    centroid = _points(madras_edges, 1).mean(axis=0)
+    best = None
+    for _, offset, scale in candidates:
+        center = (offset[0] + centroid[0] * scale, offset[1] + centroid[1] * scale)
+        scale_step = SCALE_STEP
+        for factor, source in levels:
+            points = _points(sources[source], source) - centroid
+            # Re-center the grid until the best cell is its middle one
+            for _ in range(MAX_PASSES):
+                score, moved, rescaled = _refine(points, targets[factor], factor, center, scale, scale_step)
+                if (moved, rescaled) == (center, scale):
+                    break
+                center, scale = moved, rescaled
+            scale_step /= 2
+        if best is None or score > best[0]:
+            best = (score, center, scale)
+
+    _, center, scale = best
+    offset = (center[0] - centroid[0] * scale, center[1] - centroid[1] * scale)
+    result = evaluate(madras_edges, outline_edges, offset, scale)
+    return result._replace(seconds=time.time() - started)
+
+
+def register(madras_pixels, outline_pixels, scale_range=SCALE_RANGE):
+    """register_edges() on the coastlines of the two maps."""
+    return register_edges(madras_coast(madras_pixels), outline_coast(find_coastline(outline_pixels)),
+                          scale_range)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Register the Madras map onto the princely states outline.")
+    parser.add_argument('madras', nargs='?', default=madras_path)
+    parser.add_argument('outline', nargs='?', default=outline_path)
+    parser.add_argument('-o', '--output', default=output_path, help="JSON file for the calibration")
+    parser.add_argument('--scale-range', type=float, nargs=2, default=SCALE_RANGE, metavar=('MIN', 'MAX'))
+    args = parser.parse_args()
+
+    started = time.time()
+    madras_edges = madras_coast(cached_image(args.madras))
+    outline_edges = outline_coast(load_coastline(args.outline))
+    print(f"Coast edges: Madras {np.count_nonzero(madras_edges)} px, "
+          f"outline {np.count_nonzero(outline_edges)} px ({time.time() - started:.1f}s)")
+
+    result = register_edges(madras_edges, outline_edges, tuple(args.scale_range))
+    print(f"\nRegistered in {result.seconds:.1f}s:")
+    print(f"  overlay_x = {result.offset[0]:.0f}")
+    print(f"  overlay_y = {result.offset[1]:.0f}")
+    print(f"  overlay_scale = {result.scale:.3f}")
+    print(f"  residual: {result.residual:.1f} px mean, {result.median:.1f} px median, "
+          f"{result.inliers:.0%} of the coast within {INLIER_DISTANCE:.0f} px")
+
+    print("\nHand alignments:")
+    for name, x, y, scale in MANUAL_CALIBRATIONS:
+        manual = evaluate(madras_edges, outline_edges, (x, y), scale)
+        print(f"  {name}: ({x}, {y}) x{scale} -> {manual.residual:.1f} px mean, "
+              f"{manual.median:.1f} px median, {manual.inliers:.0%} within {INLIER_DISTANCE:.0f} px")
+
+    with open(args.output, 'w') as f:
+        json.dump(result.to_json(), f, indent=1)
+    print(f"\nSaved to: {args.output}")
@@ -0,0 +1,159 @@
+"""
+XYZ tile pyramid for the maps in public/maps, regenerated incrementally.
+
+Level `max_zoom` is the map at native resolution cut into tile_size squares,
+so those tiles are exact crops of the source (PNG or lossless WebP). Each
+level below halves the one above with a 2x2 box filter, down to level 0 where
+the whole map fits one tile. Tiles live at <out_dir>/<z>/<x>/<y>.<fmt>.
+
+A manifest.json in out_dir records a hash of every native tile's pixels. On
+the next run only native tiles whose hash changed are re-encoded, and only
+their ancestors on the lower levels are rebuilt, so fixing one district
+touches a handful of files instead of the whole pyramid.
+
+Usage:
+    from mapio import cached_image
+    from tiles import build_pyramid
+
+    pixels = cached_image('princely-states.png')
+    stats = build_pyramid(pixels, 'public/tiles/princely-states')
+    print(stats.written, stats.skipped)
+"""
+import hashlib
+import json
+import math
+import os
+import shutil
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image
+
+TILE_SIZE = 256
+FORMATS = ('png', 'webp')
+MANIFEST = 'manifest.json'
+
+
+class PyramidStats(NamedTuple):
+    """Outcome of one build_pyramid() run."""
+    max_zoom: int
+    written: int     # tiles encoded this run, all levels
+    skipped: int     # tiles left as they were
+    changed: int     # native tiles whose pixels changed
+
+
+def max_zoom_for(width, height, tile_size=TILE_SIZE):
+    """Lowest level count so that level 0 fits one tile."""
+    return max(0, math.ceil(math.log2(max(width, height) / tile_size)))
+
+
+def halve(level):
+    """Downsample an (h, w, c) level by 2 with a 2x2 box filter; odd edges repeat."""
+    h, w = level.shape[:2]
+    if h % 2 or w % 2:
+        level = np.pad(level, ((0, h % 2), (0, w % 2), (0, 0)), mode='edge')
+    acc = level.astype(np.uint16)
+    acc = acc[0::2, 0::2] + acc[1::2, 0::2] + acc[0::2, 1::2] + acc[1::2, 1::2]
+    return ((acc + 2) >> 2).astype(np.uint8)
+
+
+def tiles_in(rect, tile_size=TILE_SIZE):
+    """(x, y) of the native tiles overlapping an (x0, y0, x1, y1) rectangle."""
+    x0, y0, x1, y1 = rect
+    return {(tx, ty)
+            for ty in range(y0 // tile_size, (y1 - 1) // tile_size + 1)
+            for tx in range(x0 // tile_size, (x1 - 1) // tile_size + 1)}
+
+
+def tile_hashes(pixels, tile_size=TILE_SIZE, keys=None):
+    """{(x, y): hex digest} of every native tile's pixels, or just of `keys`."""
+    h, w = pixels.shape[:2]
+    if keys is None:
+        keys = [(tx, ty) for ty in range(math.ceil(h / tile_size))
+                for tx in range(math.ceil(w / tile_size))]
+    hashes = {}
+    for tx, ty in keys:
+        if tx * tile_size < w and ty * tile_size < h:
+            tile = pixels[ty * tile_size:(ty + 1) * tile_size, tx * tile_size:(tx + 1) * tile_size]
+            hashes[(tx, ty)] = hashlib.blake2b(np.ascontiguousarray(tile), digest_size=16).hexdigest()
+    return hashes
+
+
+def _load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_tile(level, tx, ty, path, fmt, tile_size):
+    tile = level[ty * tile_size:(ty + 1) * tile_size, tx * tile_size:(tx + 1) * tile_size]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if fmt == 'webp':
+        Image.fromarray(tile).save(path, lossless=True, quality=100, method=4)
+    else:
+        Image.fromarray(tile).save(path)
+
+
+def build_pyramid(pixels, out_dir, tile_size=TILE_SIZE, fmt='png', force=False, rects=None):
+    """
+    Write (or update) the tile pyramid of an (h, w, 3) image under out_dir.
+
+    Tiles are rebuilt only where the native pixels changed since the manifest
+    was written, or everywhere when `force` is set or the size, tile size or
+    format changed. `rects` lists the (x0, y0, x1, y1) boxes an edit touched;
+    when given, only native tiles under them are even hashed. Returns
+    PyramidStats.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown tile format {fmt!r}; expected one of {FORMATS}")
+    h, w = pixels.shape[:2]
+    max_zoom = max_zoom_for(w, h, tile_size)
+    manifest = None if force else _load_manifest(out_dir)
+    layout = {'width': w, 'height': h, 'tile_size': tile_size, 'format': fmt, 'max_zoom': max_zoom}
+    if manifest is not None and all(manifest.get(k) == v for k, v in layout.items()):
+        old = manifest.get('tiles', {})
+        if rects is None:
+            hashes = tile_hashes(pixels, tile_size)
+        else:
+            # Outside the edited rectangles the manifest is still right
+            keys = set().union(*(tiles_in(r, tile_size) for r in rects))
+            hashes = {tuple(map(int, key.split('/'))): digest for key, digest in old.items()}
+            hashes.update(tile_hashes(pixels, tile_size, keys))
+        dirty = {key for key, digest in hashes.items() if old.get('%d/%d' % key) != digest}
+    else:
+        hashes = tile_hashes(pixels, tile_size)
+        # Different layout: nothing on disk can be reused
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+        dirty = set(hashes)
+    changed = len(dirty)
+
+    # Lower levels are only downsampled if some tile on them needs writing
+    levels = [pixels]
+
+    def level_at(z):
+        while len(levels) <= max_zoom - z:
+            levels.append(halve(levels[-1]))
+        return levels[max_zoom - z]
+
+    written = skipped = 0
+    for z in range(max_zoom, -1, -1):
+        scale = 2 ** (max_zoom - z)
+        lh, lw = math.ceil(h / scale), math.ceil(w / scale)
+        for ty in range(math.ceil(lh / tile_size)):
+            for tx in range(math.ceil(lw / tile_size)):
+                path = os.path.join(out_dir, str(z), str(tx), f'{ty}.{fmt}')
+                if (tx, ty) in dirty or not os.path.exists(path):
+                    _save_tile(level_at(z), tx, ty, path, fmt, tile_size)
+                    written += 1
+                else:
+                    skipped += 1
+        # A parent tile changes when any of its four children did
+        dirty = {(tx // 2, ty // 2) for tx, ty in dirty}
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, MANIFEST), 'w') as f:
+        json.dump(dict(layout, tiles={'%d/%d' % key: digest for key, digest in hashes.items()}), f)
+    return PyramidStats(max_zoom, written, skipped, changed)
@@ -0,0 +1,160 @@
+"""
+Apply one edit to every variant of the princely states map at once.
+
+public/maps holds several renderings of the same 7051x6581 map (plain,
+presidencies, all-peach, with-Arcot) that should all receive the same
+district edits. Running an extend script once per file repeated the scan and
+the region growing for each of them. Here the edit is computed as a Region
+in map pixels; apply_to_variants() then decodes, paints and re-encodes every
+variant in parallel worker processes, so an extra variant costs about one
+decode and one encode.
+
+The variants are not identical (Ramnad is drawn on presidencies-map.png
+only, for one), so edit_variants() groups them by the classified contents of
+the window the edit reads, runs the scan once per group on its cached
+decode, and paints every distinct result once, onto the variants that
+produced it. `only` limits the paint on each variant to its own pixels of
+the given palette classes, so an edit never covers outlines, sea or another
+state that happen to lie inside the region.
+
+Scripts that use it must keep their top-level work under
+`if __name__ == '__main__':`, because worker processes re-import the main
+module when they start.
+
+Usage:
+    from variants import MAP_VARIANTS, apply_to_variants, variant_paths
+
+    paths = variant_paths('/.../public/maps')
+
+    def strip(pixels):
+        return region_from_mask(palette.mask(pixels[y0:y1, x0:x1], 'peach'), origin=(x0, y0))
+
+    edit_variants(strip, RAMNAD, paths, (x0, y0, x1, y1), palette,
+                  only=(5, ('peach', 'peach_border')))
+
+    # Or one region computed elsewhere, painted onto every variant
+    apply_to_variants(region, RAMNAD, paths, only=(5, ('peach', 'peach_border')))
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image
+
+from floodfill import Region
+from hatching import paint_hatched
+from mapio import cached_image, content_hash, save_if_changed
+from palette import map_palette
+
+# Variants of the princely states map in public/maps; the first is the reference
+MAP_VARIANTS = (
+    'princely-states.png',
+    'presidencies-map.png',
+    'princely-states-all-peach.png',
+    'princely-states-with-arcot.png',
+)
+
+
+class VariantResult(NamedTuple):
+    """What apply_to_variants() did to one file."""
+    path: str
+    bbox: tuple         # (x0, y0, x1, y1) painted, or None
+    written: bool       # False when the file already held the edited pixels
+    seconds: float
+
+
+def variant_paths(maps_dir, names=MAP_VARIANTS):
+    """Absolute paths of the variants that exist in maps_dir, reference first."""
+    paths = [os.path.join(maps_dir, name) for name in names]
+    return [path for path in paths if os.path.exists(path)]
+
+
+def _apply(path, region, style, shape, profile, only):
+    started = time.time()
+    pixels = np.array(cached_image(path))   # writable copy of the cached decode
+    if pixels.shape[:2] != shape:
+        raise ValueError(f"{path} is {pixels.shape[1]}x{pixels.shape[0]}, "
+                         f"the edit was computed on a {shape[1]}x{shape[0]} map")
+    if only is not None:
+        tolerance, names = only
+        region = Region(region.mask & map_palette(tolerance).mask(pixels[region.window()], *names),
+                        region.bbox)
+    before = content_hash(pixels)
+    bbox = paint_hatched(pixels, region, style)
+    written = bbox is not None and save_if_changed(pixels, path, before, profile=profile)
+    return VariantResult(path, bbox, written, time.time() - started)
+
+
+def apply_to_variants(region, style, paths, shape=None, workers=None, profile='production', only=None):
+    """
+    Paint `region` with a HatchStyle onto every map in `paths` and save them.
+
+    `shape` is the (h, w) of the map the region was computed on (by default
+    that of paths[0]); a variant of another size is an error. `only` =
+    (tolerance, class names) paints just the region's pixels that are of
+    those palette classes on each variant. Files run in
+    up to `workers` processes (default: one per file, capped at the CPU
+    count); workers=1 runs them in this process. Returns a VariantResult per
+    path, in order.
+    """
+    if not paths:
+        return []
+    if shape is None:
+        with Image.open(paths[0]) as img:
+            shape = (img.height, img.width)
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    jobs = [(path, region, style, tuple(shape), profile, only) for path in paths]
+    if workers <= 1:
+        results = [_apply(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_apply, *zip(*jobs)))
+    for result in results:
+        name = os.path.basename(result.path)
+        if result.bbox is None:
+            print(f"  {name}: nothing to paint")
+        elif result.written:
+            print(f"  {name}: saved (modified {result.bbox}) in {result.seconds:.1f}s")
+        else:
+            print(f"  {name}: already up to date, not re-encoded")
+    return results
+
+
+def edit_variants(edit, style, paths, window, palette=None, workers=None, profile='production', only=None):
+    """
+    Run `edit(pixels) -> Region` on the variants and paint each result where it came from.
+
+    The edit must read only the pixels inside `window` = (x0, y0, x1, y1), and
+    through `palette` when one is given. Variants are grouped by the content
+    hash of that window (classified by `palette`, else raw), and the edit runs
+    once per group, serially in this process, on the first member's cached
+    decode; princely-states, -all-peach and -with-arcot usually share one
+    scan. Variants whose regions are equal are painted together by one
+    apply_to_variants() call. Returns the VariantResults of the variants that
+    had something to paint.
+    """
+    x0, y0, x1, y1 = window
+    scans = {}
+    for path in paths:
+        pixels = cached_image(path)
+        view = pixels[y0:y1, x0:x1]
+        key = (pixels.shape, content_hash(palette.classify(view) if palette is not None else view))
+        scans.setdefault(key, (pixels, []))[1].append(path)
+    groups = {}
+    for pixels, scanned in scans.values():
+        names = ', '.join(os.path.basename(p) for p in scanned)
+        print(f"  Scanning {names}")
+        region = edit(pixels)
+        if not region.area:
+            print(f"  {names}: nothing to edit")
+            continue
+        key = (region.bbox, content_hash(region.mask))
+        groups.setdefault(key, (region, pixels.shape[:2], []))[2].extend(scanned)
+    results = []
+    for region, shape, group in groups.values():
+        print(f"  Painting {region.area} px in {region.bbox} on "
+              f"{', '.join(os.path.basename(p) for p in group)}")
+        results += apply_to_variants(region, style, group, shape, workers, profile, only)
+    return results
@@ -1,9 +1,8 @@
 """Verify no peach pixels remain in the east Ramnad region."""
-from PIL import Image
-import numpy as np
+from mapcheck import ClassMaps, run_check
+from mapio import cached_image
 
-img = Image.open('/Users/sahanavasanth/Desktop/LavenderCoinApp/public/maps/princely-states.png').convert('RGB')
-pixels = np.array(img)
+pixels = cached_image('/Users/sahanavasanth/Desktop/LavenderCoinApp/public/maps/princely-states.png')
 
 # Check the same rows as before
 for y in [5930, 5943, 5963, 5983, 6003, 6023, 6043]:
@@ -14,12 +13,10 @@ for y in [5930, 5943, 5963, 5983, 6003, 6023, 6043]:
             print(f"  x={x}: ({r},{g},{b})", end="")
     print()
 
-# Count remaining peach pixels in the region
-peach_count = 0
-for y in range(5920, 6070):
-    for x in range(3540, 3620):
-        r, g, b = int(pixels[y, x, 0]), int(pixels[y, x, 1]), int(pixels[y, x, 2])
-        if abs(r - 255) < 10 and abs(g - 200) < 10 and abs(b - 180) < 10:
-            peach_count += 1
-
-print(f"\nRemaining peach pixels in region: {peach_count}")
+# Remaining peach pixels in the region, with the boxes they sit in (mapcheck.py)
+result = run_check(ClassMaps({'princely': pixels}),
+                   {'name': 'No peach left east of Ramnad', 'assert': 'absent',
+                    'classes': ['peach'], 'bounds': [3540, 5920, 3620, 6070]})
+print(f"\n{'PASS' if result.passed else 'FAIL'}  {result.name}: {result.detail}")
+for x0, y0, x1, y1, area in result.boxes:
+    print(f"  ({x0}, {y0}, {x1}, {y1}): {area} px")
@@ -0,0 +1,210 @@
+"""
+Inverse-mapping warp of Madras-map rasters onto the princely states map.
+
+Instead of pushing every source pixel forward into a scaled block, a warp
+grid stores, for every target pixel in the source's footprint, the nearest
+source pixel: the transform's inverse is evaluated once at each target pixel
+center, in row bands, and floored. Drawing districts is then two gathers
+(fill labels and border dots) and a paint. Nearest-neighbour sampling keeps
+the colors exact, and every target pixel gets exactly one source pixel, so a
+non-integer scale leaves no seams or double-painted rows.
+
+A grid depends only on the transform and the two image sizes, so it is kept
+in memory and as a .npy file in mapio.CACHE_DIR. Re-rendering after a color
+or district change skips the transform entirely. Costly transforms (a georef
+transfer takes ~20 s over the Madras footprint) are evaluated on an 8-pixel
+lattice and interpolated, which changes the sampled pixel for about 1 in
+20,000 target pixels.
+
+Transforms:
+    ScaleOffset((x, y), scale)        the OVERLAY_X/Y/SCALE calibrations
+    GeorefTransfer(madras, princely)  through both maps' georef.py fits
+
+Usage:
+    from warp import GeorefTransfer, render_warped, warp_grid
+
+    grid = warp_grid(GeorefTransfer(Georef.for_image(madras_path), princely_georef),
+                     madras_pixels.shape, princely_pixels.shape)
+    render_warped(princely_pixels, [(arcot, ARCOT), (madurai, MADURAI)], grid)
+"""
+import hashlib
+import json
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from georef import Georef, transfer
+from hatching import district_labels, paint_labels
+from mapio import CACHE_DIR
+
+BAND_ROWS = 256         # target rows per inverse-mapping pass
+EDGE_SAMPLES = 64       # points per source edge when finding the footprint
+
+
+class ScaleOffset(NamedTuple):
+    """target = offset + source * scale."""
+    offset: tuple
+    scale: float
+    step = 1            # cheap and affine: evaluate at every pixel
+
+    @property
+    def key(self):
+        return f'scale-offset {self.offset[0]} {self.offset[1]} {self.scale}'
+
+    def forward(self, x, y):
+        return self.offset[0] + np.asarray(x) * self.scale, self.offset[1] + np.asarray(y) * self.scale
+
+    def inverse(self, x, y):
+        return (np.asarray(x) - self.offset[0]) / self.scale, (np.asarray(y) - self.offset[1]) / self.scale
+
+
+class GeorefTransfer(NamedTuple):
+    """Source map pixel -> (lon, lat) -> target map pixel."""
+    source: Georef
+    target: Georef
+    step = 8            # smooth but costly: evaluate on a lattice and interpolate
+
+    @property
+    def key(self):
+        fits = json.dumps([self.source.to_json(), self.target.to_json()], sort_keys=True)
+        return 'georef ' + hashlib.blake2b(fits.encode(), digest_size=12).hexdigest()
+
+    def forward(self, x, y):
+        return transfer(self.source, self.target, x, y)
+
+    def inverse(self, x, y):
+        return transfer(self.target, self.source, x, y)
+
+
+class WarpGrid(NamedTuple):
+    """The nearest source pixel of every target pixel in `window`."""
+    window: tuple       # (x0, y0, x1, y1) on the target
+    src_x: np.ndarray   # (h, w) int16; -1 where the source does not reach
+    src_y: np.ndarray
+
+    def gather(self, raster, origin=(0, 0)):
+        """Values of a source raster whose [0, 0] is source pixel `origin`; 0 outside it."""
+        h, w = raster.shape[:2]
+        u = self.src_x.astype(np.int32) - origin[0]
+        v = self.src_y.astype(np.int32) - origin[1]
+        inside = (u >= 0) & (u < w) & (v >= 0) & (v < h)
+        flat = np.clip(v, 0, h - 1) * w + np.clip(u, 0, w - 1)
+        return np.where(inside, raster.reshape(h * w, *raster.shape[2:])[flat], 0).astype(raster.dtype)
+
+
+def footprint(transform, src_shape, dst_shape):
+    """Target (x0, y0, x1, y1) covering the whole source image, clipped to the target."""
+    h, w = src_shape[:2]
+    t = np.linspace(0, 1, EDGE_SAMPLES)
+    xs = np.concatenate([t * w, np.full_like(t, w), t * w, np.zeros_like(t)])
+    ys = np.concatenate([np.zeros_like(t), t * h, np.full_like(t, h), t * h])
+    tx, ty = transform.forward(xs, ys)
+    dh, dw = dst_shape[:2]
+    x0, y0 = max(0, int(np.floor(tx.min())) - 1), max(0, int(np.floor(ty.min())) - 1)
+    x1, y1 = min(dw, int(np.ceil(tx.max())) + 1), min(dh, int(np.ceil(ty.max())) + 1)
+    return (x0, y0, max(x0, x1), max(y0, y1))
+
+
+def _lattice_inverse(transform, xs, rows, step):
+    """transform.inverse() at every (xs, rows) pair, from a lattice every `step` pixels, bilinearly."""
+    lx = np.append(xs[::step], xs[-1])
+    ly = np.append(rows[::step], rows[-1])
+    sx, sy = transform.inverse(lx[None, :], ly[:, None])
+    # Fractional lattice position of every pixel along each axis
+    fx = np.interp(xs, lx, np.arange(len(lx)))
+    fy = np.interp(rows, ly, np.arange(len(ly)))
+    cx, cy = np.minimum(fx.astype(int), len(lx) - 2), np.minimum(fy.astype(int), len(ly) - 2)
+    tx, ty = (fx - cx)[None, :], (fy - cy)[:, None]
+
+    def blend(grid):
+        top = grid[cy][:, cx] * (1 - tx) + grid[cy][:, cx + 1] * tx
+        bottom = grid[cy + 1][:, cx] * (1 - tx) + grid[cy + 1][:, cx + 1] * tx
+        return top * (1 - ty) + bottom * ty
+    return blend(sx), blend(sy)
+
+
+def build_grid(transform, src_shape, dst_shape, step=1):
+    """
+    Evaluate the inverse transform at every target pixel center of the footprint.
+
+    With step > 1 it is evaluated exactly only every `step` pixels and
+    interpolated in between, which is plenty for smooth transforms such as
+    a georef transfer and many times faster.
+    """
+    h, w = src_shape[:2]
+    x0, y0, x1, y1 = window = footprint(transform, src_shape, dst_shape)
+    src_x = np.full((y1 - y0, x1 - x0), -1, dtype=np.int16)
+    src_y = np.full_like(src_x, -1)
+    xs = np.arange(x0, x1) + 0.5
+    for band in range(y0, y1, BAND_ROWS):
+        rows = np.arange(band, min(band + BAND_ROWS, y1)) + 0.5
+        if step > 1 and len(xs) > 1 and len(rows) > 1:
+            sx, sy = _lattice_inverse(transform, xs, rows, step)
+        else:
+            sx, sy = transform.inverse(xs[None, :], rows[:, None])
+        ix, iy = np.floor(sx), np.floor(sy)
+        inside = (ix >= 0) & (ix < w) & (iy >= 0) & (iy < h)
+        out = np.s_[band - y0:band - y0 + len(rows)]
+        src_x[out] = np.where(inside, ix, -1)
+        src_y[out] = np.where(inside, iy, -1)
+    return WarpGrid(window, src_x, src_y)
+
+
+_grids = {}
+
+
+def warp_grid(transform, src_shape, dst_shape, cache_dir=CACHE_DIR):
+    """build_grid() at the transform's lattice step, memoized in this process and on disk."""
+    key = f'{transform.key} step {transform.step} {tuple(src_shape[:2])} {tuple(dst_shape[:2])}'
+    if key in _grids:
+        return _grids[key]
+    digest = hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+    path = os.path.join(cache_dir, f'warp.{digest}.npy')
+    meta_path = os.path.join(cache_dir, f'warp.{digest}.json')
+    if os.path.exists(path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            window = tuple(json.load(f)['window'])
+        src = np.load(path, mmap_mode='r')
+        grid = WarpGrid(window, src[0], src[1])
+    else:
+        grid = build_grid(transform, src_shape, dst_shape, transform.step)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.stack([grid.src_x, grid.src_y]))
+        os.replace(tmp_path, path)
+        with open(meta_path, 'w') as f:
+            json.dump({'key': key, 'window': list(grid.window)}, f)
+    _grids[key] = grid
+    return grid
+
+
+def render_warped(canvas, districts, grid, dash=4, gap=3):
+    """
+    Draw (region, HatchStyle) pairs in source pixels onto `canvas` through a WarpGrid.
+
+    Same look as hatching.render_districts(): fill and stripes, dotted
+    borders grown by one pixel, later districts on top. Returns the
+    (x0, y0, x1, y1) canvas window that was touched, or None.
+    """
+    districts = [(r, s) for r, s in districts if r.mask.size]
+    rasters = district_labels(districts, dash, gap)
+    if rasters is None:
+        return None
+    (sx0, sy0, _, _), fill_labels, border_labels = rasters
+    labels = grid.gather(fill_labels, (sx0, sy0))
+    dots = grid.gather(border_labels, (sx0, sy0))
+
+    # Only paint the part of the footprint the districts landed on (plus the border overhang)
+    rows = np.flatnonzero((labels > 0).any(axis=1) | (dots > 0).any(axis=1))
+    cols = np.flatnonzero((labels > 0).any(axis=0) | (dots > 0).any(axis=0))
+    if not len(rows):
+        return None
+    gx0, gy0 = grid.window[:2]
+    r0, r1 = max(0, rows[0] - 1), min(labels.shape[0], rows[-1] + 2)
+    c0, c1 = max(0, cols[0] - 1), min(labels.shape[1], cols[-1] + 2)
+    x0, y0, x1, y1 = int(gx0 + c0), int(gy0 + r0), int(gx0 + c1), int(gy0 + r1)
+    paint_labels(canvas[y0:y1, x0:x1], [s for _, s in districts],
+                 labels[r0:r1, c0:c1], dots[r0:r1, c0:c1], x0, y0)
+    return (x0, y0, x1, y1)